@@ -14,94 +14,125 @@ This script handles:
 
 import os
 import sys
+import pwd
+import grp
 import subprocess
 import argparse
 import shutil
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import re
 from pathlib import Path
+from dataclasses import dataclass
 from string import Template
 from typing import Dict, Any
 import json
 from datetime import datetime
 
+try:
+    # Optional: orjson serializes faster and returns bytes directly
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dump_json_bytes(data):
+    """Serialize data as indented JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+@dataclass(frozen=True)
+class StudySlugs:
+    """Names derived from the study name, computed in one place."""
+    dash: str
+    underscore: str
+    env_name: str
+    api_service: str
+    internal_service: str
+
+
+@functools.lru_cache(maxsize=None)
+def get_study_slugs(study_name):
+    """Return the StudySlugs for a study name."""
+    dash = study_name.lower().replace(' ', '-')
+    return StudySlugs(
+        dash=dash,
+        underscore=study_name.lower().replace(' ', '_'),
+        env_name=f"{dash}-env",
+        api_service=f"{dash}-api",
+        internal_service=f"{dash}-internal",
+    )
 
-def run_command(command, check=True, capture_output=False):
-    """Run a shell command and handle errors."""
-    try:
-        if capture_output:
-            result = subprocess.run(command, shell=True, check=check, 
-                                  capture_output=True, text=True)
-            return result.stdout.strip()
-        else:
-            subprocess.run(command, shell=True, check=check)
-            return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command: {command}")
-        print(f"Error: {e}")
-        if check:
-            sys.exit(1)
-        return False
 
+# Config "paths" entries, relative to the study directory
+STUDY_PATH_SUFFIXES = {
+    "logs_dir": "logs",
+    "data_dir": "data",
+    "static_dir": "static",
+    "uploads_dir": "uploads",
+    "data_upload_path": "data_uploads/uploads",
+    "data_processed_path": "data_uploads/processed",
+    "data_exceptions_path": "data_uploads/exceptions",
+    "data_upload_logs_path": "data_uploads/logs",
+    "active_sensing_upload_path": "active_sensing",
+    "ema_file_path": "ema_surveys",
+}
 
-def check_submodule_setup():
-    """Check if submodule is properly set up."""
-    print("🔍 Checking submodule setup...")
-    
-    # Check if we're in the framework directory
-    if not Path("study_framework_core").exists():
-        print("❌ Error: study_framework_core not found!")
-        print("Please ensure you're running this script from the ubiwell-study-backend-core directory")
-        return False
-    
-    # Check if parent directory has .git (indicating it's a git repo)
-    parent_dir = Path("..")
-    if not (parent_dir / ".git").exists():
-        print("⚠️  Warning: Parent directory is not a git repository")
-        print("Consider initializing git in the parent directory for better version control")
-    
-    print("✅ Submodule setup validated")
-    return True
 
+# KEY:value lines printed by the admin-creation snippet run in the study environment
+ADMIN_RESULT_LINE = re.compile(r'^(SUCCESS|USERNAME|PASSWORD|ERROR):(.*)$', re.M)
 
-def ensure_gitmodules():
-    """Create .gitmodules file if it doesn't exist."""
-    print("📝 Checking .gitmodules file...")
-    
-    gitmodules_path = Path("../.gitmodules")
-    if not gitmodules_path.exists():
-        print("📝 Creating .gitmodules file...")
-        gitmodules_content = """[submodule "ubiwell-study-backend-core"]
-    path = ubiwell-study-backend-core
-    url = https://github.com/your-org/ubiwell-study-backend-core.git
-    branch = main
-"""
-        gitmodules_path.write_text(gitmodules_content)
-        print("✅ Created .gitmodules file")
-    else:
-        print("✅ .gitmodules file already exists")
 
+# pip arguments for unattended installs: never prompt, and skip pip's own
+# version check, which otherwise makes a network request on every run
+PIP_INSTALL_ARGS = ("install", "--no-input", "--disable-pip-version-check")
 
-def get_framework_version():
-    """Get the current framework version."""
-    try:
-        # Try to get git commit hash
-        commit_hash = run_command("git rev-parse --short HEAD", capture_output=True)
-        return f"commit {commit_hash}"
-    except:
-        return "unknown"
 
+# Wheel cache for uv; kept across study setups on the same host
+UV_CACHE_DIR = "/var/cache/study-framework/uv"
 
-def create_study_readme(study_name, study_dir):
-    """Create a README.md with extension instructions."""
-    print("📖 Creating README.md with extension instructions...")
+
+def get_pip_install_command(env_prefix):
+    """Return the argv prefix used to install packages into the environment.
     
-    readme_content = f"""# {study_name}
+    uv resolves and installs much faster than pip, so it is used when it is
+    available on the host; otherwise the environment's own pip is used.
+    """
+    uv_path = shutil.which("uv")
+    if uv_path:
+        return [uv_path, "pip", "install", "--cache-dir", UV_CACHE_DIR,
+                "--python", str(Path(env_prefix) / "bin" / "python")]
+    return [str(Path(env_prefix) / "bin" / "pip"), *PIP_INSTALL_ARGS]
+
+
+# Networks allowed to reach the internal dashboard; everything else is denied
+INTERNAL_WEB_ALLOWED_NETWORKS = (
+    "129.10.0.0/16",
+    "129.10.128.0/17",
+    "129.10.64.0/18",
+    "155.33.0.0/16",
+    "155.33.0.0/17",
+    "10.0.0.0/8",
+)
+
+
+def get_internal_access_rules(networks=INTERNAL_WEB_ALLOWED_NETWORKS):
+    """Render nginx allow/deny lines for the internal dashboard location."""
+    return "\n".join([f"        allow {network};" for network in networks] + ["        deny all;"])
+
+
+# Templates for generated files, parsed once at import. string.Template keeps the
+# nginx/systemd braces literal; "$$" would be needed for a literal dollar sign.
+STUDY_README_TEMPLATE = Template("""# $study_name
 
 This study uses the Ubiwell Study Framework.
 
 ## Setup
 - Framework: ubiwell-study-backend-core (submodule)
-- Created: {datetime.now().strftime('%Y-%m-%d')}
-- Framework version: {get_framework_version()}
+- Created: $created
+- Framework version: $framework_version
 
 ## Structure
 - `ubiwell-study-backend-core/` - Framework code
@@ -157,23 +188,491 @@ python update_core.py
 - Templates: `templates/` (extends framework templates)
 
 ## Services
-- API Service: `{study_name.lower().replace(' ', '-')}-api`
-- Internal Web Service: `{study_name.lower().replace(' ', '-')}-internal`
+- API Service: `$api_service`
+- Internal Web Service: `$internal_service`
 
 ## Access URLs
-- API: https://your-domain.com/{study_name.lower().replace(' ', '_')}/api/v1/
-- Dashboard: https://your-domain.com/{study_name.lower().replace(' ', '_')}/internal_web
-- API Health: https://your-domain.com/{study_name.lower().replace(' ', '_')}/api/health
-- Internal Health: https://your-domain.com/{study_name.lower().replace(' ', '_')}/internal/health
+- API: https://your-domain.com/$url_slug/api/v1/
+- Dashboard: https://your-domain.com/$url_slug/internal_web
+- API Health: https://your-domain.com/$url_slug/api/health
+- Internal Health: https://your-domain.com/$url_slug/internal/health
+""")
+
+GUNICORN_SERVICE_TEMPLATE = Template("""[Unit]
+Description=$description
+After=network.target
+
+[Service]
+User=$user
+Group=www-data
+WorkingDirectory=$study_dir
+Environment="PATH=$conda_prefix/bin"
+Environment="PYTHONDONTWRITEBYTECODE=1"
+Environment="PYTHONUNBUFFERED=1"
+Environment="MALLOC_ARENA_MAX=2"
+Environment="OMP_NUM_THREADS=1"
+LimitNOFILE=65536
+ExecStart=$conda_prefix/bin/gunicorn --workers $workers --worker-class gthread --threads $threads --preload --bind unix:/var/sockets/$service_name.sock -m 007 $wsgi_module:app --access-logfile $study_dir/logs/${log_prefix}_gunicorn_access.log --error-logfile $study_dir/logs/${log_prefix}_gunicorn_error.log
+Restart=always
+RestartSec=5
+
+[Install]
+WantedBy=multi-user.target
+""")
+
+NGINX_SITE_TEMPLATE = Template("""# $study_name Nginx Configuration (Separate Services)
+
+# Gunicorn sockets, with idle connections kept open for reuse
+upstream $api_service {
+    server unix:/var/sockets/$api_service.sock;
+    keepalive 32;
+}
+
+upstream $internal_service {
+    server unix:/var/sockets/$internal_service.sock;
+    keepalive 16;
+}
+
+server {
+    listen 80;
+    server_name _;
+
+    # API endpoints (Priority #1 - Data Collection)
+    location /api/v1/ {
+        include proxy_params;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_pass http://$api_service;
+    }
+
+    # Internal web dashboard (Priority #2 - Dashboard)
+    location /internal_web {
+        # Allow specific IP ranges (customize as needed)
+$internal_access_rules
+
+        include proxy_params;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_pass http://$internal_service;
+    }
+
+    # Health check endpoints
+    location /api/health {
+        include proxy_params;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_pass http://$api_service;
+    }
+
+    location /internal/health {
+        include proxy_params;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_pass http://$internal_service;
+    }
+
+    # Static files
+    location /static/ {
+        alias /mnt/study/$static_slug/static/;
+        expires 30d;
+        add_header Cache-Control "public, immutable";
+        # Serve straight from the page cache and compress text assets
+        sendfile on;
+        tcp_nopush on;
+        open_file_cache max=1000 inactive=60s;
+        gzip on;
+        gzip_vary on;
+        gzip_min_length 1024;
+        gzip_types text/css application/javascript image/svg+xml;
+    }
+}
+""")
+
+SERVICE_README_TEMPLATE = Template("""# $study_name
+
+This study is deployed using the Study Framework Core.
+
+## Quick Start
+
+1. **Start the service:**
+   ```bash
+   sudo systemctl start $service_name
+   ```
+
+2. **Check status:**
+   ```bash
+   sudo systemctl status $service_name
+   ```
+
+3. **View logs:**
+   ```bash
+   sudo journalctl -u $service_name -f
+   ```
+
+## Configuration
+
+- **Config file:** `config/study_config.json`
+- **Logs:** `logs/`
+- **Data:** `data/`
+- **Static files:** `static/`
+
+## URLs
+
+- **API:** `https://your-domain.com/$url_slug/api/v1/`
+- **Dashboard:** `https://your-domain.com/$url_slug/internal_web`
+
+## Maintenance
+
+The services load the app once at start-up (gunicorn `--preload`), so code and config
+changes need `systemctl restart`; `systemctl reload` does not pick them up.
+
+### Update the study:
+```bash
+cd $study_dir
+git pull
+sudo systemctl restart $service_name
+```
+
+### Update the framework:
+```bash
+conda activate $env_name
+pip install --upgrade study-framework-core
+sudo systemctl restart $service_name
+```
+
+## Troubleshooting
+
+1. **Check service status:**
+   ```bash
+   sudo systemctl status $service_name
+   ```
+
+2. **Check nginx status:**
+   ```bash
+   sudo systemctl status nginx
+   ```
+
+3. **Check logs:**
+   ```bash
+   sudo tail -f $study_dir/logs/gunicorn_error.log
+   ```
+""")
+
+API_WSGI_TEMPLATE = Template("""#!/usr/bin/env python3
+\"\"\"
+API WSGI entry point for $study_name (Data Collection - Priority #1)
+\"\"\"
+
+import sys
+import os
+from pathlib import Path
+
+# Add the submodule to Python path
+study_path = Path(__file__).parent
+submodule_path = study_path / "ubiwell-study-backend-core"
+sys.path.insert(0, str(submodule_path))
+
+# Set environment variable for config
+os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
+
+from study_framework_core.core.config import get_config
+from study_framework_core.core.api import CoreAPIEndpoints
+from flask import Flask
+from flask_restful import Api
+
+# Load configuration
+config = get_config()
+
+# Create Flask app
+app = Flask(__name__)
+
+# Create Flask-RESTful API
+api = Api(app, prefix='/api/v1')
+
+# Create API instance
+core_api = CoreAPIEndpoints(api, config.security.auth_key)
+
+if __name__ == "__main__":
+    app.run()
+""")
+
+INTERNAL_WSGI_TEMPLATE = Template("""#!/usr/bin/env python3
+\"\"\"
+Internal Web WSGI entry point for $study_name (Dashboard - Priority #2)
+\"\"\"
+
+import sys
+import os
+from pathlib import Path
+
+# Add the submodule to Python path
+study_path = Path(__file__).parent
+submodule_path = study_path / "ubiwell-study-backend-core"
+sys.path.insert(0, str(submodule_path))
+
+# Set environment variable for config
+os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
+
+from study_framework_core.core.internal_web import InternalWebBase, SimpleDashboard
+from flask import Flask
+
+# Create Flask app with template directory
+template_dir = submodule_path / "study_framework_core" / "templates"
+app = Flask(__name__, template_folder=str(template_dir))
+
+# Create dashboard instance
+dashboard = SimpleDashboard()
+
+# Create internal web instance (registers its routes on app)
+internal_web = InternalWebBase(app, dashboard)
+
+if __name__ == "__main__":
+    app.run()
+""")
+
+
+def escape_docstring_text(text):
+    """Escape text for use inside a generated triple-quoted Python docstring."""
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def run_command(argv, check=True, capture_output=False, input=None):
+    """Run a command (given as an argv list, without a shell) and handle errors.
+    
+    input, if given, is passed to the command's stdin as bytes.
+    """
+    try:
+        if capture_output:
+            # Capture raw bytes and decode once, tolerating non-UTF-8 output from tools
+            result = subprocess.run(argv, check=check, capture_output=True, input=input)
+            return result.stdout.decode('utf-8', 'replace').strip()
+        else:
+            result = subprocess.run(argv, check=check, input=input)
+            return result.returncode == 0
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Error running command: {' '.join(map(str, argv))}")
+        print(f"Error: {e}")
+        if check:
+            sys.exit(1)
+        return False
+
+
+# Results of filesystem probes (hits and misses), keyed by absolute path
+_path_cache = {}
+# Entries of directories already listed by path_exists, keyed by directory
+_dir_entries = {}
+
+
+def path_exists(path):
+    """Return whether path exists, remembering the answer for reuse.
+    
+    The first probe in a directory lists it once with os.scandir; later probes
+    for siblings are answered from that listing without another stat.
+    """
+    path = os.path.abspath(path)
+    try:
+        return _path_cache[path]
+    except KeyError:
+        pass
+    
+    parent, name = os.path.split(path)
+    if parent not in _dir_entries:
+        try:
+            with os.scandir(parent) as it:
+                _dir_entries[parent] = {entry.name: entry for entry in it}
+        except OSError:
+            _dir_entries[parent] = {}
+    
+    entry = _dir_entries[parent].get(name)
+    if entry is None:
+        exists = False
+    elif entry.is_symlink():
+        # Follow the link so a dangling symlink does not count as existing
+        exists = os.path.exists(path)
+    else:
+        exists = True
+    _path_cache[path] = exists
+    return exists
+
+
+def mark_path_exists(path):
+    """Record a path this script has just created so cached probes stay accurate."""
+    _path_cache[os.path.abspath(path)] = True
+
+
+def write_files(files, mode=None):
+    """Write (path, bytes) pairs concurrently, creating parent directories as needed.
+    
+    Each file is a single write; running them on threads lets slow filesystems
+    (e.g. a network-mounted /mnt/study) overlap the round trips.
+    """
+    def write(item):
+        path, data = item
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        if mode is not None:
+            os.chmod(path, mode)
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(files) or 1)) as pool:
+        # list() re-raises the first error from any write
+        list(pool.map(write, files))
+
+
+def atomic_write_bytes(path, data, mode=0o644):
+    """Write data to path via a temporary file and rename, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+
+def chown_tree(root, user):
+    """Recursively set user:user ownership on root (in-process equivalent of chown -R).
+    
+    Entries that already have the right owner, such as the directories created
+    by create_directory_structure, are skipped, so re-runs only touch what changed.
+    """
+    uid = pwd.getpwnam(user).pw_uid
+    gid = grp.getgrnam(user).gr_gid
+    
+    def needs_chown(st):
+        return st.st_uid != uid or st.st_gid != gid
+    
+    if needs_chown(os.lstat(root)):
+        os.chown(root, uid, gid, follow_symlinks=False)
+    pending = [os.fspath(root)]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            for entry in it:
+                if needs_chown(entry.stat(follow_symlinks=False)):
+                    os.chown(entry.path, uid, gid, follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+
+
+def validate_environment(args):
+    """Run cheap pre-flight checks before any setup work is done.
+    
+    Reports every problem found at once and exits if there are any, so a
+    misconfigured run fails before services, symlinks or environments are touched.
+    """
+    print("🔍 Running pre-flight checks...")
+    errors = []
+    
+    if os.geteuid() != 0:
+        errors.append("This script must be run as root (use sudo)")
+    
+    if not re.fullmatch(r"[A-Za-z0-9 _-]+", args.study_name):
+        errors.append(f"Invalid study name '{args.study_name}' (use letters, digits, spaces, '-' and '_')")
+    
+    try:
+        pwd.getpwnam(args.user)
+        grp.getgrnam(args.user)
+    except KeyError:
+        errors.append(f"User/group '{args.user}' does not exist")
+    
+    if not str(args.db_port).isdigit() or not 0 < int(args.db_port) < 65536:
+        errors.append(f"Invalid MongoDB port: {args.db_port}")
+    
+    if not Path("study_framework_core").is_dir():
+        errors.append("study_framework_core not found (run this script from the ubiwell-study-backend-core directory)")
+    
+    for directory in ("/etc/systemd/system", "/etc/nginx/sites-available", "/etc/nginx/sites-enabled"):
+        if not os.access(directory, os.W_OK):
+            errors.append(f"Cannot write to {directory}")
+    
+    if errors:
+        print("❌ Pre-flight checks failed:")
+        for error in errors:
+            print(f"  - {error}")
+        sys.exit(1)
+    
+    print("✅ Pre-flight checks passed")
+
+
+def check_submodule_setup():
+    """Check if submodule is properly set up."""
+    print("🔍 Checking submodule setup...")
+    
+    # Check if we're in the framework directory
+    if not path_exists("study_framework_core"):
+        print("❌ Error: study_framework_core not found!")
+        print("Please ensure you're running this script from the ubiwell-study-backend-core directory")
+        return False
+    
+    # Check if parent directory has .git (indicating it's a git repo)
+    if not path_exists("../.git"):
+        print("⚠️  Warning: Parent directory is not a git repository")
+        print("Consider initializing git in the parent directory for better version control")
+    
+    print("✅ Submodule setup validated")
+    return True
+
+
+def ensure_gitmodules():
+    """Create .gitmodules file if it doesn't exist."""
+    print("📝 Checking .gitmodules file...")
+    
+    gitmodules_path = Path("../.gitmodules")
+    if not path_exists(gitmodules_path):
+        print("📝 Creating .gitmodules file...")
+        gitmodules_content = """[submodule "ubiwell-study-backend-core"]
+    path = ubiwell-study-backend-core
+    url = https://github.com/your-org/ubiwell-study-backend-core.git
+    branch = main
 """
+        gitmodules_path.write_text(gitmodules_content)
+        mark_path_exists(gitmodules_path)
+        print("✅ Created .gitmodules file")
+    else:
+        print("✅ .gitmodules file already exists")
+
+
+def get_framework_version():
+    """Get the current framework version."""
+    try:
+        # Try to get git commit hash
+        commit_hash = run_command(["git", "rev-parse", "--short", "HEAD"], capture_output=True)
+        return f"commit {commit_hash}"
+    except:
+        return "unknown"
+
+
+def create_study_readme(study_name, study_dir):
+    """Create a README.md with extension instructions."""
+    print("📖 Creating README.md with extension instructions...")
+    slugs = get_study_slugs(study_name)
+    
+    readme_content = STUDY_README_TEMPLATE.substitute(
+        study_name=study_name,
+        created=datetime.now().strftime('%Y-%m-%d'),
+        framework_version=get_framework_version(),
+        api_service=slugs.api_service,
+        internal_service=slugs.internal_service,
+        url_slug=slugs.underscore,
+    )
     
     readme_path = Path("../README.md")
-    readme_path.write_text(readme_content)
+    readme_path.write_bytes(readme_content.encode('utf-8'))
     print("✅ Created README.md with extension instructions")
 
 
-def check_anaconda():
-    """Check if Anaconda/Miniconda is installed and find the best path."""
+@functools.lru_cache(maxsize=None)
+def check_anaconda(conda_path=None, install=False, assume_yes=False):
+    """Check if Anaconda/Miniconda is installed and find the best path.
+    
+    Prompts are only shown when stdin is a terminal and assume_yes is not set;
+    otherwise the first installation found is used.
+    """
+    if conda_path:
+        if not path_exists(conda_path):
+            print(f"❌ Conda not found at: {conda_path}")
+            sys.exit(1)
+        print(f"✅ Using conda at: {conda_path}")
+        return conda_path
+    
     print("🔍 Looking for Anaconda/Miniconda installations...")
     
     # Common Anaconda installation paths (since we're running as sudo)
@@ -192,38 +691,34 @@ def check_anaconda():
     # Check each common path
     for path_pattern in common_paths:
         if '*' in path_pattern:
-            # Handle glob patterns
+            # Handle glob patterns (glob only yields paths that exist)
             import glob
-            matches = glob.glob(path_pattern)
-            for match in matches:
-                if os.path.exists(match):
-                    found_installations.append(match)
+            for match in glob.iglob(path_pattern):
+                mark_path_exists(match)
+                found_installations.append(match)
         else:
             # Direct path
-            if os.path.exists(path_pattern):
+            if path_exists(path_pattern):
                 found_installations.append(path_pattern)
     
+    interactive = sys.stdin.isatty() and not assume_yes
+    
     # If found multiple installations, let user choose
     if len(found_installations) > 1:
         print(f"✅ Found {len(found_installations)} Anaconda/Miniconda installations:")
         for i, path in enumerate(found_installations, 1):
             print(f"  {i}. {path}")
         
-        while True:
-            try:
+        selected_path = found_installations[0]
+        if interactive:
+            choices = {str(i): path for i, path in enumerate(found_installations, 1)}
+            choices[""] = found_installations[0]
+            while True:
                 choice = input(f"\nSelect installation (1-{len(found_installations)}) or press Enter for first option: ").strip()
-                if not choice:
-                    selected_path = found_installations[0]
+                if choice in choices:
+                    selected_path = choices[choice]
                     break
-                else:
-                    choice_idx = int(choice) - 1
-                    if 0 <= choice_idx < len(found_installations):
-                        selected_path = found_installations[choice_idx]
-                        break
-                    else:
-                        print(f"❌ Invalid choice. Please enter 1-{len(found_installations)}")
-            except ValueError:
-                print("❌ Invalid input. Please enter a number.")
+                print(f"❌ Invalid choice. Please enter 1-{len(found_installations)}")
         
         print(f"✅ Using conda at: {selected_path}")
         return selected_path
@@ -241,50 +736,167 @@ def check_anaconda():
         for path in common_paths:
             print(f"  - {path}")
         
+        if install:
+            return install_anaconda(assume_yes)
+        if not interactive:
+            print("💡 Re-run with --conda-path PATH or --install-anaconda")
+            sys.exit(1)
+        
         print("\n💡 Options:")
         print("1. Install Anaconda/Miniconda automatically")
         print("2. Provide the path to your conda installation")
         print("3. Exit and install manually")
         
+        def ask_for_path():
+            user_path = input("Enter the full path to conda: ").strip()
+            if path_exists(user_path):
+                print(f"✅ Using conda at: {user_path}")
+                return user_path
+            print(f"❌ Path does not exist: {user_path}")
+            return None
+        
+        def cancel():
+            print("❌ Setup cancelled. Please install Anaconda/Miniconda manually.")
+            print("Download from: https://docs.conda.io/en/latest/miniconda.html")
+            sys.exit(1)
+        
+        actions = {"1": install_anaconda, "2": ask_for_path, "3": cancel}
         while True:
-            choice = input("\nEnter your choice (1-3): ").strip()
-            
-            if choice == "1":
-                return install_anaconda()
-            elif choice == "2":
-                user_path = input("Enter the full path to conda: ").strip()
-                if os.path.exists(user_path):
-                    print(f"✅ Using conda at: {user_path}")
-                    return user_path
-                else:
-                    print(f"❌ Path does not exist: {user_path}")
-                    continue
-            elif choice == "3":
-                print("❌ Setup cancelled. Please install Anaconda/Miniconda manually.")
-                print("Download from: https://docs.conda.io/en/latest/miniconda.html")
-                sys.exit(1)
-            else:
+            action = actions.get(input("\nEnter your choice (1-3): ").strip())
+            if action is None:
                 print("❌ Invalid choice. Please enter 1, 2, or 3.")
+                continue
+            selected_path = action()
+            if selected_path:
+                return selected_path
 
 
-def install_anaconda():
+def download_file(url, dest, chunk_size=1024 * 1024):
+    """Stream url to dest in chunks, resuming a partial download if one exists.
+    
+    A partial file is only resumed with If-Range set to the ETag (or
+    Last-Modified) saved when it was started, so a file that changed upstream
+    in the meantime is downloaded again from the start instead of spliced.
+    
+    Returns the SHA256 hex digest of the complete file.
+    """
+    import hashlib
+    import urllib.error
+    import urllib.request
+    
+    digest = hashlib.sha256()
+    validator_path = f"{dest}.validator"
+    existing = os.path.getsize(dest) if os.path.exists(dest) else 0
+    validator = None
+    if existing and os.path.exists(validator_path):
+        with open(validator_path) as f:
+            validator = f.read().strip() or None
+    headers = {'Range': f'bytes={existing}-', 'If-Range': validator} if validator else {}
+    
+    try:
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as e:
+        if e.code != 416:
+            raise
+        # Range not satisfiable: the leftover file is not a usable prefix, start over
+        os.remove(dest)
+        os.remove(validator_path)
+        return download_file(url, dest, chunk_size)
+    
+    with response:
+        if validator and response.status == 206:
+            print(f"  Resuming download from {existing // (1024 * 1024)} MB")
+            mode = 'ab'
+            with open(dest, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+        else:
+            # Full response: remember its validator so an interrupted download can be resumed
+            mode = 'wb'
+            validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            if validator:
+                with open(validator_path, 'w') as f:
+                    f.write(validator + "\n")
+            elif os.path.exists(validator_path):
+                os.remove(validator_path)
+        
+        with open(dest, mode) as f:
+            for chunk in iter(lambda: response.read(chunk_size), b''):
+                f.write(chunk)
+                digest.update(chunk)
+    
+    # Complete; the cached copy is tracked by its SHA256 from here on
+    if os.path.exists(validator_path):
+        os.remove(validator_path)
+    return digest.hexdigest()
+
+
+# Downloaded installers are kept here so re-runs on the same host can reuse them
+INSTALLER_CACHE_DIR = "/var/cache/study-framework"
+
+
+def fetch_cached_installer(url, filename):
+    """Return the path of a cached copy of url, downloading it only if needed.
+    
+    A completed download is recorded in a .sha256 file next to it; the cached
+    copy is reused while its hash still matches, and a partial one is resumed.
+    """
+    import hashlib
+    
+    os.makedirs(INSTALLER_CACHE_DIR, exist_ok=True)
+    installer_path = os.path.join(INSTALLER_CACHE_DIR, filename)
+    digest_path = f"{installer_path}.sha256"
+    
+    if os.path.exists(installer_path) and os.path.exists(digest_path):
+        with open(digest_path) as f:
+            expected = f.read().strip()
+        digest = hashlib.sha256()
+        with open(installer_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        if digest.hexdigest() == expected:
+            print(f"✅ Using cached installer: {installer_path}")
+            return installer_path
+        # Stale or corrupted copy: download it again from scratch
+        os.remove(installer_path)
+    
+    print(f"📥 Downloading {url}...")
+    installer_sha256 = download_file(url, installer_path)
+    with open(digest_path, 'w') as f:
+        f.write(installer_sha256 + "\n")
+    print(f"  SHA256: {installer_sha256}")
+    return installer_path
+
+
+def discard_cached_installer(installer_path):
+    """Remove a cached installer and its recorded hash so the next run downloads it again."""
+    for path in (installer_path, f"{installer_path}.sha256"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def install_anaconda(assume_yes=False):
     """Install Anaconda/Miniconda automatically."""
     print("🚀 Installing Anaconda/Miniconda...")
     
-    # Ask user for installation path
-    while True:
+    # Ask user for installation path (non-interactive runs use the default)
+    install_path = "/mnt/study/anaconda3"
+    if assume_yes or not sys.stdin.isatty():
+        if path_exists(install_path) and not assume_yes:
+            print(f"❌ Path {install_path} already exists. Re-run with --yes to overwrite it.")
+            sys.exit(1)
+    else:
+        install_path = None
+    
+    while install_path is None:
         install_path = input("Enter installation path (default: /mnt/study/anaconda3): ").strip()
         if not install_path:
             install_path = "/mnt/study/anaconda3"
         
-        if os.path.exists(install_path):
+        if path_exists(install_path):
             overwrite = input(f"Path {install_path} already exists. Overwrite? (y/N): ").strip().lower()
-            if overwrite in ['y', 'yes']:
-                break
-            else:
-                continue
-        else:
-            break
+            if overwrite not in ['y', 'yes']:
+                install_path = None
     
     print(f"📦 Installing Anaconda to: {install_path}")
     
@@ -293,26 +905,21 @@ def install_anaconda():
         # Create installation directory
         os.makedirs(os.path.dirname(install_path), exist_ok=True)
         
-        # Download Miniconda installer
-        import urllib.request
-        import tempfile
-        
+        # Get the Miniconda installer (cached between runs, partial downloads are resumed)
         miniconda_url = "https://repo.anaconda.com/miniconda/Miniconda3-latest-Linux-x86_64.sh"
-        installer_path = "/tmp/miniconda_installer.sh"
-        
-        print("📥 Downloading Miniconda installer...")
-        urllib.request.urlretrieve(miniconda_url, installer_path)
+        installer_path = fetch_cached_installer(miniconda_url, "Miniconda3-latest-Linux-x86_64.sh")
         
         # Make installer executable
         os.chmod(installer_path, 0o755)
         
         # Run installer
         print("🔧 Running Miniconda installer...")
-        install_command = f"bash {installer_path} -b -p {install_path} -f"
-        run_command(install_command)
-        
-        # Clean up installer
-        os.remove(installer_path)
+        if not run_command(["bash", installer_path, "-b", "-p", install_path, "-f"], check=False):
+            # The cached copy may be what is broken; don't reuse it next time
+            discard_cached_installer(installer_path)
+            print("❌ Miniconda installer failed.")
+            print("💡 Please install Anaconda/Miniconda manually from: https://docs.conda.io/en/latest/miniconda.html")
+            sys.exit(1)
         
         conda_path = f"{install_path}/bin/conda"
         if os.path.exists(conda_path):
@@ -328,40 +935,150 @@ def install_anaconda():
         sys.exit(1)
 
 
-def create_conda_environment(study_name, python_version="3.9", conda_path=None):
-    """Create a conda environment for the study."""
-    env_name = f"{study_name.lower().replace(' ', '-')}-env"
+@functools.lru_cache(maxsize=None)
+def get_conda_info(conda_path):
+    """Return the parsed output of `conda info --json` (cached; call cache_clear() after changes)."""
+    output = run_command([conda_path, "info", "--json"], check=False, capture_output=True)
+    try:
+        return json.loads(output) if output else {}
+    except ValueError:
+        return {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_env_prefix(conda_path, env_name):
+    """Return the prefix directory of a conda environment.
+    
+    Uses conda's standard layout (<install>/envs/<name>) and only consults the
+    cached `conda info` output when that directory does not exist.
+    """
+    env_prefix = Path(conda_path).resolve().parent.parent / "envs" / env_name
+    if env_prefix.is_dir():
+        return str(env_prefix)
+    for prefix in get_conda_info(conda_path).get("envs", []):
+        if Path(prefix).name == env_name:
+            return prefix
+    return str(env_prefix)
+
+
+@functools.lru_cache(maxsize=None)
+def get_solver_args(conda_path):
+    """Return the arguments selecting the libmamba solver, if this conda install has it.
+    
+    libmamba is much faster than the classic solver on fresh environments; it is the
+    default since conda 23.10, and older installs may have it as a plugin.
+    """
+    base_dir = Path(conda_path).resolve().parent.parent
+    if any(base_dir.glob("lib/python*/site-packages/conda_libmamba_solver")):
+        return ("--solver", "libmamba")
+    return ()
+
+
+# conda's record for the python package itself (not python_abi, python-dateutil, ...)
+CONDA_PYTHON_RECORD = re.compile(r'python-(\d[^-]*)-[^-]+\.json')
+
+
+def get_env_python_version(env_prefix):
+    """Return the full Python version installed in the environment at env_prefix, or None.
+    
+    Reads conda's package records (conda-meta/python-<version>-<build>.json)
+    rather than starting the interpreter.
+    """
+    try:
+        with os.scandir(Path(env_prefix) / "conda-meta") as it:
+            names = [entry.name for entry in it]
+    except OSError:
+        return None
+    for name in names:
+        match = CONDA_PYTHON_RECORD.fullmatch(name)
+        if match:
+            return match.group(1)
+    return None
+
+
+def env_has_python(env_prefix, python_version):
+    """Return whether the environment at env_prefix has the given Python version."""
+    installed = get_env_python_version(env_prefix)
+    return installed is not None and (installed == python_version or installed.startswith(f"{python_version}."))
+
+
+def create_conda_environment(study_name, python_version="3.9", conda_path=None, recreate=False):
+    """Create a conda environment for the study, reusing a matching existing one unless recreate is set."""
+    slugs = get_study_slugs(study_name)
+    env_name = slugs.env_name
     
     print(f"🔧 Creating conda environment: {env_name}")
     
-    # Check if environment already exists
-    env_exists = run_command(f"{conda_path} env list | grep {env_name}", check=False, capture_output=True)
-    
-    if env_exists:
+    # Check if environment already exists (a directory check; conda is only asked
+    # when the environment is not in the standard location)
+    env_prefix = get_env_prefix(conda_path, env_name)
+    if os.path.isdir(env_prefix):
+        if not recreate and env_has_python(env_prefix, python_version):
+            # Skips the solve and package downloads; install_packages brings it up to date
+            print(f"✅ Reusing existing environment {env_name} (Python {python_version})")
+            return env_name
         print(f"⚠️  Environment {env_name} already exists. Removing it...")
-        run_command(f"{conda_path} env remove -n {env_name} -y")
+        run_command([conda_path, "env", "remove", "-n", env_name, "-y"])
     
     # Create new environment
-    run_command(f"{conda_path} create -n {env_name} python={python_version} -y")
+    run_command([conda_path, "create", *get_solver_args(conda_path), "-n", env_name, f"python={python_version}", "-y"])
+    get_conda_info.cache_clear()
+    get_env_prefix.cache_clear()
     
     print(f"✅ Created conda environment: {env_name}")
     return env_name
 
 
+# Written into the environment after a successful install_packages run
+INSTALL_STAMP_NAME = ".study-install-key"
+
+
+def get_install_key(*input_files, python_version=None):
+    """Return a hash of the files (and Python version) that determine what install_packages installs."""
+    import hashlib
+    
+    digest = hashlib.sha256()
+    digest.update(f"python={python_version}".encode('utf-8') + b"\0")
+    for path in input_files:
+        digest.update(str(path).encode('utf-8') + b"\0")
+        try:
+            digest.update(Path(path).read_bytes())
+        except OSError:
+            digest.update(b"<missing>")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
 def install_packages(env_name, study_path, conda_path=None):
     """Install required packages in the conda environment."""
     print(f"📦 Installing packages in {env_name}")
     
+    # Install into the environment directly (uv or its pip) instead of going through `conda run`
+    env_prefix = Path(get_env_prefix(conda_path, env_name))
+    install_command = get_pip_install_command(env_prefix)
+    
     # Get the requirements.txt path
     requirements_path = Path(__file__).parent / "requirements.txt"
     
+    # A reused environment that was already installed from the same inputs is left as is
+    # pyproject.toml holds the [project] dependencies that `-e .` installs
+    install_key = get_install_key(requirements_path, Path(study_path) / "setup.py", Path(study_path) / "pyproject.toml",
+                                  python_version=get_env_python_version(env_prefix))
+    stamp_file = env_prefix / INSTALL_STAMP_NAME
+    try:
+        if stamp_file.read_text().strip() == install_key:
+            print("✅ Packages already installed from the same requirements, skipping pip")
+            return
+    except OSError:
+        pass
+    
     if requirements_path.exists():
         print(f"  Installing from requirements.txt: {requirements_path}")
-        run_command(f"{conda_path} run -n {env_name} pip install -r {requirements_path}")
+        requirements = ["-r", str(requirements_path)]
     else:
         print("⚠️  requirements.txt not found, installing packages individually...")
         # Fallback to individual packages
-        conda_packages = [
+        requirements = [
             "flask",
             "flask-restful", 
             "pymongo",
@@ -376,19 +1093,14 @@ def install_packages(env_name, study_path, conda_path=None):
             "geopy",
             "plotly"
         ]
-        
-        for package in conda_packages:
-            print(f"  Installing {package}...")
-            run_command(f"{conda_path} run -n {env_name} pip install {package}")
-    
-    # Install the study framework core in editable mode for easy updates
-    print("  Installing study-framework-core in editable mode...")
-    run_command(f"{conda_path} run -n {env_name} pip install -e .")
+        print(f"  Installing {', '.join(requirements)}...")
     
-    # Install gunicorn if not already installed
-    print("  Installing gunicorn...")
-    run_command(f"{conda_path} run -n {env_name} pip install gunicorn")
+    # The study framework core (editable, for easy updates) and gunicorn go in the
+    # same install run, so everything is resolved together in one pass
+    print("  Installing study-framework-core in editable mode and gunicorn...")
+    run_command([*install_command, *requirements, "-e", ".", "gunicorn"])
     
+    stamp_file.write_text(install_key + "\n")
     print("✅ All packages installed successfully")
 
 
@@ -397,32 +1109,44 @@ def create_directory_structure(study_name, base_dir, user):
     # Use the base_dir directly as the study directory (no nested folder)
     study_dir = Path(base_dir)
     
-    directories = [
-        study_dir,
-        study_dir / "logs",
-        study_dir / "data",
-        study_dir / "static",
-        study_dir / "uploads",
-        study_dir / "config",
-        study_dir / "templates",
-        study_dir / "scripts",
-        study_dir / "static" / "css",
-        study_dir / "static" / "js",
-        study_dir / "data_uploads" / "uploads",
-        study_dir / "data_uploads" / "processed",
-        study_dir / "data_uploads" / "exceptions",
-        study_dir / "data_uploads" / "logs",
-        study_dir / "active_sensing",
-        study_dir / "ema_surveys",
-        study_dir / "config-files" / "global",
+    # Leaf directories; their parents are derived below
+    leaves = [
+        "logs",
+        "data",
+        "uploads",
+        "config",
+        "templates",
+        "scripts",
+        "static/css",
+        "static/js",
+        "data_uploads/uploads",
+        "data_uploads/processed",
+        "data_uploads/exceptions",
+        "data_uploads/logs",
+        "active_sensing",
+        "ema_surveys",
+        "config-files/global",
     ]
     
+    # Every directory including intermediate ones, shallowest first, so each is
+    # created with a single mkdir once its parent exists
+    relative_dirs = {Path(".")}
+    for leaf in leaves:
+        relative = Path(leaf)
+        relative_dirs.add(relative)
+        relative_dirs.update(relative.parents)
+    directories = [study_dir / relative for relative in sorted(relative_dirs, key=lambda p: (len(p.parts), p.parts))]
+    
     print(f"📁 Creating directory structure in {study_dir}")
     
+    # Resolve ownership once and chown in-process rather than spawning chown per directory
+    uid = pwd.getpwnam(user).pw_uid
+    gid = grp.getgrnam(user).gr_gid
+    
+    study_dir.parent.mkdir(parents=True, exist_ok=True)
     for directory in directories:
-        directory.mkdir(parents=True, exist_ok=True)
-        # Set ownership to the user
-        run_command(f"chown {user}:{user} {directory}")
+        directory.mkdir(exist_ok=True)
+        os.chown(directory, uid, gid)
         print(f"  Created: {directory}")
     
     # Copy processing scripts
@@ -431,148 +1155,146 @@ def create_directory_structure(study_name, base_dir, user):
     return study_dir
 
 
+# Threads per gunicorn worker; requests mostly wait on MongoDB, so a thread
+# serves the next one instead of the whole worker process blocking
+API_THREADS = 8
+INTERNAL_THREADS = 4
+
+
+def get_worker_counts():
+    """Return (api_workers, internal_workers) gunicorn worker counts for this host.
+    
+    The API gets the usual 2 * CPUs + 1 (capped at 16); the dashboard sees far
+    less traffic, so it gets half the CPUs with a minimum of two.
+    """
+    cpu = os.cpu_count() or 2
+    return min(2 * cpu + 1, 16), max(2, cpu // 2)
+
+
 def create_systemd_service(study_name, env_name, study_dir, user, base_dir, conda_path=None):
     """Create separate systemd services for API and internal web."""
-    api_service_name = f"{study_name.lower().replace(' ', '-')}-api"
-    internal_service_name = f"{study_name.lower().replace(' ', '-')}-internal"
+    slugs = get_study_slugs(study_name)
+    api_service_name = slugs.api_service
+    internal_service_name = slugs.internal_service
     
     # Create socket directory
     socket_dir = "/var/sockets"
-    run_command(f"mkdir -p {socket_dir}")
-    run_command(f"chown {user}:www-data {socket_dir}")
-    run_command(f"chmod 755 {socket_dir}")
+    os.makedirs(socket_dir, exist_ok=True)
+    os.chown(socket_dir, pwd.getpwnam(user).pw_uid, grp.getgrnam("www-data").gr_gid)
+    os.chmod(socket_dir, 0o755)
     
     # Get conda environment path
-    conda_prefix = run_command(f"{conda_path} run -n {env_name} python -c 'import sys; print(sys.prefix)'", capture_output=True)
+    conda_prefix = get_env_prefix(conda_path, env_name)
+    if not os.path.exists(os.path.join(conda_prefix, "bin", "gunicorn")):
+        print(f"⚠️  gunicorn not found in {conda_prefix}/bin; the services will fail to start until it is installed")
+    api_workers, internal_workers = get_worker_counts()
     
     # API Service (Priority #1 - Data Collection)
-    api_service_content = f"""[Unit]
-Description=API Gunicorn instance to serve {study_name} (Data Collection - Priority #1)
-After=network.target
-
-[Service]
-User={user}
-Group=www-data
-WorkingDirectory={study_dir}
-Environment="PATH={conda_prefix}/bin"
-ExecStart={conda_prefix}/bin/gunicorn --workers 3 --bind unix:/var/sockets/{api_service_name}.sock -m 007 api_wsgi:app --access-logfile {study_dir}/logs/api_gunicorn_access.log --error-logfile {study_dir}/logs/api_gunicorn_error.log
-Restart=always
-RestartSec=5
-
-[Install]
-WantedBy=multi-user.target
-"""
+    api_service_content = GUNICORN_SERVICE_TEMPLATE.substitute(
+        description=f"API Gunicorn instance to serve {study_name} (Data Collection - Priority #1)",
+        user=user,
+        study_dir=study_dir,
+        conda_prefix=conda_prefix,
+        workers=api_workers,
+        threads=API_THREADS,
+        service_name=api_service_name,
+        wsgi_module="api_wsgi",
+        log_prefix="api",
+    )
     
     api_service_file = f"/etc/systemd/system/{api_service_name}.service"
     
     print(f"🔧 Creating API systemd service: {api_service_file}")
     
-    with open(api_service_file, 'w') as f:
-        f.write(api_service_content)
+    atomic_write_bytes(api_service_file, api_service_content.encode('utf-8'))
     
     # Internal Web Service (Priority #2 - Dashboard)
-    internal_service_content = f"""[Unit]
-Description=Internal Web Gunicorn instance to serve {study_name} (Dashboard - Priority #2)
-After=network.target
-
-[Service]
-User={user}
-Group=www-data
-WorkingDirectory={study_dir}
-Environment="PATH={conda_prefix}/bin"
-ExecStart={conda_prefix}/bin/gunicorn --workers 2 --bind unix:/var/sockets/{internal_service_name}.sock -m 007 internal_wsgi:app --access-logfile {study_dir}/logs/internal_gunicorn_access.log --error-logfile {study_dir}/logs/internal_gunicorn_error.log
-Restart=always
-RestartSec=5
-
-[Install]
-WantedBy=multi-user.target
-"""
+    internal_service_content = GUNICORN_SERVICE_TEMPLATE.substitute(
+        description=f"Internal Web Gunicorn instance to serve {study_name} (Dashboard - Priority #2)",
+        user=user,
+        study_dir=study_dir,
+        conda_prefix=conda_prefix,
+        workers=internal_workers,
+        threads=INTERNAL_THREADS,
+        service_name=internal_service_name,
+        wsgi_module="internal_wsgi",
+        log_prefix="internal",
+    )
     
     internal_service_file = f"/etc/systemd/system/{internal_service_name}.service"
     
     print(f"🔧 Creating internal web systemd service: {internal_service_file}")
     
-    with open(internal_service_file, 'w') as f:
-        f.write(internal_service_content)
+    atomic_write_bytes(internal_service_file, internal_service_content.encode('utf-8'))
     
-    # Reload systemd and enable services
-    run_command("systemctl daemon-reload")
-    run_command(f"systemctl enable {api_service_name}")
-    run_command(f"systemctl enable {internal_service_name}")
-    
-    print(f"✅ Created and enabled API service: {api_service_name}")
-    print(f"✅ Created and enabled internal web service: {internal_service_name}")
+    # systemd is reloaded once, by activate_services, after every file is written
+    print(f"✅ Created API service: {api_service_name}")
+    print(f"✅ Created internal web service: {internal_service_name}")
     return api_service_name, internal_service_name
 
 
-def create_nginx_config(study_name, api_service_name, internal_service_name, test_config=True):
-    """Create nginx configuration with separate services."""
-    nginx_config = f"""# {study_name} Nginx Configuration (Separate Services)
-
-server {{
-    listen 80;
-    server_name _;
-
-    # API endpoints (Priority #1 - Data Collection)
-    location /api/v1/ {{
-        include proxy_params;
-        proxy_pass http://unix:/var/sockets/{api_service_name}.sock;
-    }}
-
-    # Internal web dashboard (Priority #2 - Dashboard)
-    location /internal_web {{
-        # Allow specific IP ranges (customize as needed)
-        allow 129.10.0.0/16;
-        allow 129.10.128.0/17;
-        allow 129.10.64.0/18;
-        allow 155.33.0.0/16;
-        allow 155.33.0.0/17;
-        allow 10.0.0.0/8;
-        deny all;
-
-        include proxy_params;
-        proxy_pass http://unix:/var/sockets/{internal_service_name}.sock;
-    }}
-
-    # Health check endpoints
-    location /api/health {{
-        include proxy_params;
-        proxy_pass http://unix:/var/sockets/{api_service_name}.sock;
-    }}
+def activate_services(service_names):
+    """Reload systemd, enable the given services and reload nginx, once each.
+    
+    Kept separate from file generation so a batch of studies can be set up with
+    --no-activate and activated with a single daemon-reload afterwards.
+    """
+    run_command(["systemctl", "daemon-reload"])
+    run_command(["systemctl", "enable", *service_names])
+    for service_name in service_names:
+        print(f"✅ Enabled service: {service_name}")
+    
+    print("🌐 Testing and reloading nginx configuration...")
+    if run_command(["nginx", "-t"], check=False):
+        print("✅ Nginx configuration is valid")
+        run_command(["systemctl", "reload", "nginx"])
+        print("✅ Nginx reloaded successfully")
+    else:
+        print("❌ Nginx configuration is invalid. Please check the configuration.")
 
-    location /internal/health {{
-        include proxy_params;
-        proxy_pass http://unix:/var/sockets/{internal_service_name}.sock;
-    }}
 
-    # Static files
-    location /static/ {{
-        alias /mnt/study/{study_name.lower().replace(' ', '-')}/static/;
-        expires 30d;
-        add_header Cache-Control "public, immutable";
-    }}
-}}
-"""
+def create_nginx_config(study_name, api_service_name, internal_service_name, test_config=True):
+    """Create nginx configuration with separate services."""
+    slugs = get_study_slugs(study_name)
+    nginx_config = NGINX_SITE_TEMPLATE.substitute(
+        study_name=study_name,
+        api_service=api_service_name,
+        internal_service=internal_service_name,
+        static_slug=slugs.dash,
+        internal_access_rules=get_internal_access_rules(),
+    )
     
-    nginx_file = f"/etc/nginx/sites-available/{study_name.lower().replace(' ', '-')}"
+    nginx_file = f"/etc/nginx/sites-available/{slugs.dash}"
     
     print(f"🌐 Creating nginx configuration: {nginx_file}")
     
-    with open(nginx_file, 'w') as f:
-        f.write(nginx_config)
-    
-    # Create symlink to enable the site
-    nginx_enabled = f"/etc/nginx/sites-enabled/{study_name.lower().replace(' ', '-')}"
-    if os.path.exists(nginx_enabled):
-        os.remove(nginx_enabled)
-    
-    os.symlink(nginx_file, nginx_enabled)
+    nginx_bytes = nginx_config.encode('utf-8')
+    try:
+        unchanged = Path(nginx_file).read_bytes() == nginx_bytes
+    except OSError:
+        unchanged = False
+    
+    atomic_write_bytes(nginx_file, nginx_bytes)
+    
+    # Create symlink to enable the site (atomic swap, also replaces a dangling link)
+    nginx_enabled = f"/etc/nginx/sites-enabled/{slugs.dash}"
+    unchanged = unchanged and os.path.islink(nginx_enabled) and os.readlink(nginx_enabled) == nginx_file
+    # The temporary link lives outside sites-enabled (same filesystem, so the rename
+    # stays atomic); a link left there by an interrupted run would be loaded by nginx
+    tmp_link = f"/etc/nginx/.{slugs.dash}.enabled.tmp"
+    for stale in (tmp_link, f"{nginx_enabled}.tmp"):
+        if os.path.lexists(stale):
+            os.remove(stale)
+    os.symlink(nginx_file, tmp_link)
+    os.replace(tmp_link, nginx_enabled)
     
     # Test nginx configuration (only if requested)
-    if test_config:
-        if run_command("nginx -t", check=False):
+    if test_config and unchanged:
+        print("✅ Nginx configuration unchanged, skipping test and reload")
+    elif test_config:
+        if run_command(["nginx", "-t"], check=False):
             print("✅ Nginx configuration is valid")
-            run_command("systemctl reload nginx")
+            run_command(["systemctl", "reload", "nginx"])
         else:
             print("❌ Nginx configuration is invalid. Please check the configuration.")
     else:
@@ -585,103 +1307,24 @@ def create_wsgi_files(study_dir, study_name):
     """Create separate WSGI files for API and internal web."""
     
     # API WSGI file (Priority #1 - Data Collection)
-    api_wsgi_content = f"""#!/usr/bin/env python3
-\"\"\"
-API WSGI entry point for {study_name} (Data Collection - Priority #1)
-\"\"\"
-
-import sys
-import os
-from pathlib import Path
-
-# Add the submodule to Python path
-study_path = Path(__file__).parent
-submodule_path = study_path / "ubiwell-study-backend-core"
-sys.path.insert(0, str(submodule_path))
-
-# Set environment variable for config
-os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
-
-from study_framework_core.core.config import get_config
-from study_framework_core.core.api import CoreAPIEndpoints
-from flask import Flask
-from flask_restful import Api
-
-# Load configuration
-config = get_config()
-
-# Create Flask app
-app = Flask(__name__)
-
-# Create Flask-RESTful API
-api = Api(app, prefix='/api/v1')
-
-# Create API instance
-core_api = CoreAPIEndpoints(api, config.security.auth_key)
-
-if __name__ == "__main__":
-    app.run()
-"""
+    api_wsgi_content = API_WSGI_TEMPLATE.substitute(study_name=escape_docstring_text(study_name))
     
     api_wsgi_file = study_dir / "api_wsgi.py"
     
     print(f"🐍 Creating API WSGI file: {api_wsgi_file}")
     
-    with open(api_wsgi_file, 'w') as f:
-        f.write(api_wsgi_content)
-    
     # Internal Web WSGI file (Priority #2 - Dashboard)
-    internal_wsgi_content = f"""#!/usr/bin/env python3
-\"\"\"
-Internal Web WSGI entry point for {study_name} (Dashboard - Priority #2)
-\"\"\"
-
-import sys
-import os
-from pathlib import Path
-
-# Add the submodule to Python path
-study_path = Path(__file__).parent
-submodule_path = study_path / "ubiwell-study-backend-core"
-sys.path.insert(0, str(submodule_path))
-
-# Set environment variable for config
-os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
-
-from study_framework_core.core.config import get_config
-from study_framework_core.core.internal_web import InternalWebBase, SimpleDashboard
-from flask import Flask
-
-# Load configuration
-config = get_config()
-
-# Create Flask app with template directory
-template_dir = submodule_path / "study_framework_core" / "templates"
-app = Flask(__name__, template_folder=str(template_dir))
-
-# Create dashboard instance
-dashboard = SimpleDashboard()
-
-# Create internal web instance
-internal_web = InternalWebBase(app, dashboard)
-
-# Get the Flask app
-app = internal_web.app
-
-if __name__ == "__main__":
-    app.run()
-"""
+    internal_wsgi_content = INTERNAL_WSGI_TEMPLATE.substitute(study_name=escape_docstring_text(study_name))
     
     internal_wsgi_file = study_dir / "internal_wsgi.py"
     
     print(f"🐍 Creating internal web WSGI file: {internal_wsgi_file}")
     
-    with open(internal_wsgi_file, 'w') as f:
-        f.write(internal_wsgi_content)
-    
-    # Make both executable
-    run_command(f"chmod +x {api_wsgi_file}")
-    run_command(f"chmod +x {internal_wsgi_file}")
+    # Write both and make them executable
+    write_files([
+        (api_wsgi_file, api_wsgi_content.encode('utf-8')),
+        (internal_wsgi_file, internal_wsgi_content.encode('utf-8')),
+    ], mode=0o755)
     
     return api_wsgi_file, internal_wsgi_file
 
@@ -703,10 +1346,6 @@ def create_sample_config_files(study_dir: Path):
         }
     }
     
-    global_config_path = study_dir / "config-files" / "global" / "config.json"
-    with open(global_config_path, 'w') as f:
-        json.dump(global_config, f, indent=2)
-    
     # Create sample EMA file
     ema_config = {
         "ema_surveys": [
@@ -726,43 +1365,45 @@ def create_sample_config_files(study_dir: Path):
         ]
     }
     
-    ema_file_path = study_dir / "ema_surveys" / "global" / "ema.json"
-    ema_file_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(ema_file_path, 'w') as f:
-        json.dump(ema_config, f, indent=2)
+    write_files([
+        (study_dir / "config-files" / "global" / "config.json", dump_json_bytes(global_config)),
+        (study_dir / "ema_surveys" / "global" / "ema.json", dump_json_bytes(ema_config)),
+    ])
     
     print(f"✅ Created sample config files in {study_dir}")
 
 
-def create_admin_user(study_dir: Path, db_username: str, db_password: str, db_host: str, db_port: str, db_name: str, env_name: str = None, conda_path: str = None):
-    """Create admin user for internal web access."""
+def create_admin_user(study_dir: Path, db_username: str, db_password: str, db_host: str, db_port: str, db_name: str, env_name: str = None, conda_path: str = None,
+                      config_content: Dict[str, Any] = None):
+    """Create admin user for internal web access.
+    
+    If config_content (the dict written by create_study_config) is given, it is
+    handed to the child process on stdin so study_config.json is not re-read.
+    """
     try:
-        # Set up environment for database connection
-        os.environ['STUDY_CONFIG_FILE'] = str(study_dir / "config" / "study_config.json")
-        
-        # Import after environment setup
-        import sys
-        sys.path.insert(0, str(study_dir))
-        
         # Use conda environment if available
         if env_name and conda_path:
-            # Create a temporary script to run in conda environment
-            temp_script = study_dir / "temp_create_admin.py"
-            temp_script_content = f'''#!/usr/bin/env python3
+            # Run the admin creation inline with the environment's python (no temp script, no `conda run`)
+            config_path = str(study_dir / "config" / "study_config.json")
+            admin_code = f'''import json
 import os
 import sys
-from pathlib import Path
-
-# Add the submodule to Python path
-study_path = Path("{study_dir}")
-submodule_path = study_path / "ubiwell-study-backend-core"
-sys.path.insert(0, str(submodule_path))
 
-os.environ['STUDY_CONFIG_FILE'] = "{study_dir}/config/study_config.json"
+sys.path.insert(0, {str(study_dir / "ubiwell-study-backend-core")!r})
+config_data = json.load(sys.stdin) if {config_content is not None!r} else None
+if config_data is None:
+    os.environ['STUDY_CONFIG_FILE'] = {config_path!r}
+else:
+    # Otherwise importing the config module would parse the file before set_config_file
+    os.environ.pop('STUDY_CONFIG_FILE', None)
 
 try:
+    from study_framework_core.core.config import set_config_file
     from study_framework_core.core.handlers import create_admin_user
     
+    if config_data is not None:
+        set_config_file({config_path!r}, config_data)
+    
     result = create_admin_user()
     print(f"SUCCESS:{{result['success']}}")
     print(f"USERNAME:{{result['username']}}")
@@ -775,34 +1416,25 @@ except Exception as e:
     print(f"PASSWORD:None")
     print(f"ERROR:{{str(e)}}")
 '''
-            temp_script.write_text(temp_script_content)
-            
-            # Run the script in conda environment
-            cmd = f"{conda_path} run -n {env_name} python {temp_script}"
-            result_output = run_command(cmd, capture_output=True)
+            python_path = str(Path(get_env_prefix(conda_path, env_name)) / "bin" / "python")
+            config_input = dump_json_bytes(config_content) if config_content is not None else None
+            result_output = run_command([python_path, "-c", admin_code], capture_output=True, input=config_input)
             
-            # Parse the output
-            lines = result_output.split('\n')
-            success = False
-            username = "admin"
-            password = None
-            error = None
-            
-            for line in lines:
-                if line.startswith("SUCCESS:"):
-                    success = line.split(":", 1)[1].strip() == "True"
-                elif line.startswith("USERNAME:"):
-                    username = line.split(":", 1)[1].strip()
-                elif line.startswith("PASSWORD:"):
-                    password = line.split(":", 1)[1].strip()
-                elif line.startswith("ERROR:"):
-                    error = line.split(":", 1)[1].strip()
-            
-            # Clean up temp script
-            temp_script.unlink()
+            # Parse the KEY:value lines printed by the snippet
+            fields = {key: value.strip() for key, value in ADMIN_RESULT_LINE.findall(result_output)}
+            success = fields.get("SUCCESS") == "True"
+            username = fields.get("USERNAME", "admin")
+            password = fields.get("PASSWORD")
+            error = fields.get("ERROR")
             
             result = {"success": success, "username": username, "password": password, "error": error}
         else:
+            # Set up environment for database connection
+            os.environ['STUDY_CONFIG_FILE'] = str(study_dir / "config" / "study_config.json")
+            
+            # Import after environment setup
+            sys.path.insert(0, str(study_dir))
+            
             # Fallback to direct import (may fail if dependencies not available)
             from study_framework_core.core.handlers import create_admin_user
             result = create_admin_user()
@@ -829,13 +1461,22 @@ def copy_processing_scripts(study_dir: Path):
         core_scripts_dir = Path(__file__).parent / "study_framework_core" / "scripts"
         study_scripts_dir = study_dir / "scripts"
         
-        if core_scripts_dir.exists():
-            # Copy all shell scripts
-            for script_file in core_scripts_dir.glob("*.sh"):
-                dest_file = study_scripts_dir / script_file.name
-                shutil.copy2(script_file, dest_file)
-                dest_file.chmod(0o755)  # Make executable
-                print(f"✅ Copied script: {script_file.name}")
+        if path_exists(core_scripts_dir):
+            def copy_script(src, dst):
+                # Copy contents only and set the executable mode directly (no copystat + chmod)
+                shutil.copyfile(src, dst)
+                os.chmod(dst, 0o755)
+                print(f"✅ Copied script: {os.path.basename(src)}")
+                return dst
+            
+            # Copy all shell scripts in one pass
+            shutil.copytree(
+                core_scripts_dir,
+                study_scripts_dir,
+                dirs_exist_ok=True,
+                ignore=lambda directory, names: [name for name in names if not name.endswith(".sh")],
+                copy_function=copy_script,
+            )
         else:
             print(f"⚠️  Warning: Core scripts directory not found: {core_scripts_dir}")
             
@@ -848,16 +1489,53 @@ def make_scripts_executable(study_dir: Path):
     try:
         scripts_dir = study_dir / "scripts"
         if scripts_dir.exists():
-            for script_file in scripts_dir.glob("*.sh"):
-                script_file.chmod(0o755)
-                print(f"✅ Made executable: {script_file.name}")
+            # copy_processing_scripts already sets 0o755, so usually nothing needs changing
+            with os.scandir(scripts_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".sh") or not entry.is_file():
+                        continue
+                    if entry.stat().st_mode & 0o777 != 0o755:
+                        os.chmod(entry.path, 0o755)
+                    print(f"✅ Made executable: {entry.name}")
     except Exception as e:
         print(f"⚠️  Warning: Could not make scripts executable: {e}")
 
 
+def validate_study_config(config_content: Dict[str, Any]):
+    """Validate the generated study configuration and exit with every problem found."""
+    errors = []
+    
+    def require(section, key, expected_type, check=None, message="invalid value"):
+        value = config_content.get(section, {}).get(key)
+        if not isinstance(value, expected_type) or isinstance(value, bool) and expected_type is not bool:
+            errors.append(f"{section}.{key}: expected {expected_type.__name__}, got {value!r}")
+        elif check is not None and not check(value):
+            errors.append(f"{section}.{key}: {message} ({value!r})")
+    
+    require("database", "host", str, bool, "must not be empty")
+    require("database", "port", int, lambda port: 0 < port < 65536, "must be between 1 and 65535")
+    require("database", "username", str)
+    require("database", "password", str)
+    require("database", "database", str, bool, "must not be empty")
+    require("server", "port", int, lambda port: 0 < port < 65536, "must be between 1 and 65535")
+    require("server", "workers", int, lambda workers: workers > 0, "must be positive")
+    require("security", "auth_key", str, bool, "must not be empty")
+    require("security", "announcement_pass_key", str, bool, "must not be empty")
+    for key in config_content.get("paths", {}):
+        require("paths", key, str, os.path.isabs, "must be an absolute path")
+    
+    if errors:
+        print("❌ Invalid study configuration:")
+        for error in errors:
+            print(f"  - {error}")
+        sys.exit(1)
+
+
 def create_study_config(study_name: str, study_dir: Path, db_username: str, db_password: str, 
                        db_host: str, db_port: str, db_name: str, auth_key: str, announcement_key: str) -> Dict[str, Any]:
     """Create study configuration file."""
+    slugs = get_study_slugs(study_name)
+    base = os.fspath(study_dir)
     config_content = {
         "study_name": study_name,
         "database": {
@@ -865,45 +1543,34 @@ def create_study_config(study_name: str, study_dir: Path, db_username: str, db_p
             "port": int(db_port),
             "username": db_username,
             "password": db_password,
-            "database": db_name or f"{study_name.lower().replace(' ', '_')}_db"
+            "database": db_name or f"{slugs.underscore}_db"
         },
         "server": {
             "host": "127.0.0.1",  # Localhost for production with reverse proxy
             "port": 8000,  # Only used for development or direct access
             "workers": 3,
             "debug": False,
-            "socket_path": f"/var/sockets/{study_name.lower().replace(' ', '-')}-study.sock"
+            "socket_path": f"/var/sockets/{slugs.dash}-study.sock"
         },
         "security": {
             "auth_key": auth_key,
             "tokens": ['your-auth-token'], # Placeholder, will be updated by user
             "announcement_pass_key": announcement_key
         },
-        "paths": {
-            "base_dir": str(study_dir),
-            "logs_dir": f"{study_dir}/logs",
-            "data_dir": f"{study_dir}/data",
-            "static_dir": f"{study_dir}/static",
-            "uploads_dir": f"{study_dir}/uploads",
-            "data_upload_path": f"{study_dir}/data_uploads/uploads",
-            "data_processed_path": f"{study_dir}/data_uploads/processed",
-            "data_exceptions_path": f"{study_dir}/data_uploads/exceptions",
-            "data_upload_logs_path": f"{study_dir}/data_uploads/logs",
-            "active_sensing_upload_path": f"{study_dir}/active_sensing",
-            "ema_file_path": f"{study_dir}/ema_surveys"
-        },
+        "paths": {"base_dir": base, **{key: f"{base}/{suffix}" for key, suffix in STUDY_PATH_SUFFIXES.items()}},
         "logging": {
             "level": "INFO",
-            "file_path": f"{study_dir}/logs/study.log"
+            "file_path": f"{base}/logs/study.log"
         }
     }
     
+    validate_study_config(config_content)
+    
     config_file = study_dir / "config" / "study_config.json"
     
     print(f"⚙️  Creating study configuration: {config_file}")
     
-    with open(config_file, 'w') as f:
-        json.dump(config_content, f, indent=2)
+    config_file.write_bytes(dump_json_bytes(config_content))
     
     return config_content
 
@@ -940,107 +1607,49 @@ requests>=2.25.0
     
     print(f"📋 Creating requirements file: {requirements_file}")
     
-    with open(requirements_file, 'w') as f:
-        f.write(requirements_content)
+    requirements_file.write_bytes(requirements_content.encode('utf-8'))
     
     return requirements_file
 
 
 def create_readme(study_dir, study_name, service_name):
     """Create README file for the study."""
-    readme_content = f"""# {study_name}
-
-This study is deployed using the Study Framework Core.
-
-## Quick Start
-
-1. **Start the service:**
-   ```bash
-   sudo systemctl start {service_name}
-   ```
-
-2. **Check status:**
-   ```bash
-   sudo systemctl status {service_name}
-   ```
-
-3. **View logs:**
-   ```bash
-   sudo journalctl -u {service_name} -f
-   ```
-
-## Configuration
-
-- **Config file:** `config/study_config.json`
-- **Logs:** `logs/`
-- **Data:** `data/`
-- **Static files:** `static/`
-
-## URLs
-
-- **API:** `https://your-domain.com/{study_name.lower().replace(' ', '_')}/api/v1/`
-- **Dashboard:** `https://your-domain.com/{study_name.lower().replace(' ', '_')}/internal_web`
-
-## Maintenance
-
-### Update the study:
-```bash
-cd {study_dir}
-git pull
-sudo systemctl restart {service_name}
-```
-
-### Update the framework:
-```bash
-conda activate {study_name.lower().replace(' ', '-')}-env
-pip install --upgrade study-framework-core
-sudo systemctl restart {service_name}
-```
-
-## Troubleshooting
-
-1. **Check service status:**
-   ```bash
-   sudo systemctl status {service_name}
-   ```
-
-2. **Check nginx status:**
-   ```bash
-   sudo systemctl status nginx
-   ```
-
-3. **Check logs:**
-   ```bash
-   sudo tail -f {study_dir}/logs/gunicorn_error.log
-   ```
-"""
+    slugs = get_study_slugs(study_name)
+    readme_content = SERVICE_README_TEMPLATE.substitute(
+        study_name=study_name,
+        service_name=service_name,
+        study_dir=study_dir,
+        url_slug=slugs.underscore,
+        env_name=slugs.env_name,
+    )
     
     readme_file = study_dir / "README.md"
     
     print(f"📚 Creating README file: {readme_file}")
     
-    with open(readme_file, 'w') as f:
-        f.write(readme_content)
+    readme_file.write_bytes(readme_content.encode('utf-8'))
     
     return readme_file
 
 
-def update_core_framework(study_name):
+def update_core_framework(study_name, conda_path=None):
     """Update the core framework to the latest version."""
-    env_name = f"{study_name.lower().replace(' ', '-')}-env"
+    slugs = get_study_slugs(study_name)
+    env_name = slugs.env_name
     
     print(f"🔄 Updating core framework in {env_name}")
     
     # Check Anaconda installation
-    conda_path = check_anaconda()
+    conda_path = check_anaconda(conda_path)
     
-    # Update the core package
-    run_command(f"{conda_path} run -n {env_name} pip install --upgrade -e .")
+    # Update the core package with the environment's pip directly instead of going through `conda run`
+    pip_path = str(Path(get_env_prefix(conda_path, env_name)) / "bin" / "pip")
+    run_command([pip_path, *PIP_INSTALL_ARGS, "--upgrade", "-e", "."])
     
     print("✅ Core framework updated successfully!")
     print("💡 You may need to restart the services:")
-    print(f"   sudo systemctl restart {study_name.lower().replace(' ', '-')}-api")
-    print(f"   sudo systemctl restart {study_name.lower().replace(' ', '-')}-internal")
+    print(f"   sudo systemctl restart {slugs.api_service}")
+    print(f"   sudo systemctl restart {slugs.internal_service}")
 
 
 def main():
@@ -1058,12 +1667,17 @@ def main():
     parser.add_argument('--auth-key', help='Authentication key for API')
     parser.add_argument('--announcement-key', help='Announcement pass key')
     parser.add_argument('--update', action='store_true', help='Update core framework to latest version')
+    parser.add_argument('--conda-path', help='Path to the conda executable (skips the installation search)')
+    parser.add_argument('--install-anaconda', action='store_true', help='Install Miniconda automatically if no conda is found')
+    parser.add_argument('--yes', '-y', action='store_true', help='Do not prompt; use defaults for every choice')
+    parser.add_argument('--recreate-env', action='store_true', help='Remove and recreate the conda environment even if a matching one exists')
+    parser.add_argument('--no-activate', action='store_true', help='Only write the service and nginx files; skip daemon-reload, enable and nginx reload')
     
     args = parser.parse_args()
     
     # Handle update mode
     if args.update:
-        update_core_framework(args.study_name)
+        update_core_framework(args.study_name, args.conda_path)
         return
     
     # Auto-detect study path if not specified
@@ -1075,45 +1689,23 @@ def main():
     print(f"👤 User: {args.user}")
     print(f"📁 Study directory: {args.study_path}")
     
-    # Check if running as root
-    if os.geteuid() != 0:
-        print("❌ This script must be run as root (use sudo)")
-        sys.exit(1)
+    # Fail fast on bad input or missing permissions before making any changes
+    validate_environment(args)
+    slugs = get_study_slugs(args.study_name)
     
     # Check Anaconda installation
-    conda_path = check_anaconda()
+    conda_path = check_anaconda(args.conda_path, args.install_anaconda, args.yes)
     
     # Check submodule setup
     if not check_submodule_setup():
         sys.exit(1)
     ensure_gitmodules()
 
-    # Create conda environment
-    env_name = create_conda_environment(args.study_name, args.python_version, conda_path)
-    
     # Create directory structure
     study_dir = create_directory_structure(args.study_name, args.study_path, args.user)
     
-    # Install packages
-    install_packages(env_name, Path.cwd(), conda_path)
-    
-    # Create WSGI files first
-    api_wsgi_file, internal_wsgi_file = create_wsgi_files(study_dir, args.study_name)
-    
-    # Create systemd services
-    api_service_name, internal_service_name = create_systemd_service(args.study_name, env_name, study_dir, args.user, args.study_path, conda_path)
-    
-    # Create nginx configuration (but don't test/reload yet)
-    nginx_file = create_nginx_config(args.study_name, api_service_name, internal_service_name, test_config=False)
-    
-    # Create sample config files
-    create_sample_config_files(study_dir)
-    
-    # Make processing scripts executable
-    make_scripts_executable(study_dir)
-
-    # Create configuration files
-    config_file = create_study_config(
+    # Create and validate the study configuration before the slow environment/service steps
+    config_content = create_study_config(
         args.study_name, 
         study_dir, 
         args.db_username or 'study_user',
@@ -1125,6 +1717,42 @@ def main():
         args.announcement_key or 'study123'
     )
     
+    # Create conda environment
+    env_name = create_conda_environment(args.study_name, args.python_version, conda_path, args.recreate_env)
+    
+    # Install packages; pip is by far the slowest step, so the local files below
+    # are written while it runs. The writers touch disjoint files and only need the
+    # study slugs (not the systemd units), so they also run alongside each other.
+    setup_pool = ThreadPoolExecutor(max_workers=5)
+    install_future = setup_pool.submit(install_packages, env_name, Path.cwd(), conda_path)
+    writer_futures = [
+        setup_pool.submit(create_wsgi_files, study_dir, args.study_name),
+        setup_pool.submit(create_nginx_config, args.study_name, slugs.api_service, slugs.internal_service, test_config=False),
+        setup_pool.submit(create_sample_config_files, study_dir),
+        setup_pool.submit(make_scripts_executable, study_dir),
+    ]
+    
+    # Wait for the files first (re-raises any error from them)
+    nginx_file = writer_futures[1].result()
+    for future in writer_futures:
+        future.result()
+    
+    # The services run gunicorn from the environment, so wait for the install
+    # (re-raises any error, including the exit from a failed pip command)
+    install_future.result()
+    setup_pool.shutdown()
+    
+    # Create systemd services
+    api_service_name, internal_service_name = create_systemd_service(args.study_name, env_name, study_dir, args.user, args.study_path, conda_path)
+    
+    # requirements.txt and the README (which waits on git for the framework version) are
+    # independent of the admin user, so write them while the admin user is being created
+    file_pool = ThreadPoolExecutor(max_workers=2)
+    file_futures = [
+        file_pool.submit(create_requirements_file, study_dir),
+        file_pool.submit(create_study_readme, args.study_name, study_dir),
+    ]
+    
     # Create admin user for internal web access (optional)
     print("🔐 Creating admin user for internal web access...")
     admin_password = create_admin_user(
@@ -1135,70 +1763,75 @@ def main():
         args.db_port or '27017',
         args.db_name,
         env_name,
-        conda_path
+        conda_path,
+        config_content
     )
     
     if admin_password:
         print("✅ Admin user created successfully")
     else:
         print("⚠️  Admin user creation failed - you can create it manually later")
-        print("   Run: cd /mnt/study/bean-study && python ubiwell-study-backend-core/tests/create_admin_user.py")
-    requirements_file = create_requirements_file(study_dir)
+        print(f"   Run: cd {study_dir} && python ubiwell-study-backend-core/tests/create_admin_user.py")
     
-    # Create README with extension instructions
-    create_study_readme(args.study_name, study_dir)
+    # Wait for requirements.txt and the README (re-raises any error from them)
+    for future in file_futures:
+        future.result()
+    file_pool.shutdown()
     
     # Set proper ownership
-    run_command(f"chown -R {args.user}:{args.user} {study_dir}")
+    chown_tree(study_dir, args.user)
     
-    # Test and reload nginx now that everything is set up
-    print("🌐 Testing and reloading nginx configuration...")
-    if run_command("nginx -t", check=False):
-        print("✅ Nginx configuration is valid")
-        run_command("systemctl reload nginx")
-        print("✅ Nginx reloaded successfully")
+    # Enable the services and reload nginx now that everything is set up
+    if args.no_activate:
+        print("⚠️  Skipping activation (--no-activate). When all studies are set up, run:")
+        print(f"   sudo systemctl daemon-reload && sudo systemctl enable {api_service_name} {internal_service_name}")
+        print("   sudo nginx -t && sudo systemctl reload nginx")
     else:
-        print("❌ Nginx configuration is invalid. Please check the configuration.")
-    
-    print(f"\n✅ Study setup completed successfully with separate services!")
-    print(f"📁 Study directory: {study_dir}")
-    print(f"🔧 API service name: {api_service_name} (Priority #1 - Data Collection)")
-    print(f"🔧 Internal web service name: {internal_service_name} (Priority #2 - Dashboard)")
-    print(f"🌐 Nginx config: {nginx_file}")
-    print(f"🐍 Conda environment: {env_name}")
-    
-    print(f"\n📋 Next steps:")
-    print(f"1. Edit {config_file} with your specific settings")
-    print(f"2. Start the API service: sudo systemctl start {api_service_name}")
-    print(f"3. Start the internal web service: sudo systemctl start {internal_service_name}")
-    print(f"4. Check status: sudo systemctl status {api_service_name} {internal_service_name}")
-    print(f"5. View logs: sudo journalctl -u {api_service_name} -f")
-    print(f"6. View internal logs: sudo journalctl -u {internal_service_name} -f")
-    print(f"7. Set up cron jobs: {study_dir}/scripts/setup_cron_jobs.sh --user {args.user} --env {env_name}")
-    
-    print(f"\n🌐 Access URLs:")
-    print(f"  API: https://your-domain.com/{args.study_name.lower().replace(' ', '_')}/api/v1/")
-    print(f"  Dashboard: https://your-domain.com/{args.study_name.lower().replace(' ', '_')}/internal_web")
-    print(f"  API Health: https://your-domain.com/{args.study_name.lower().replace(' ', '_')}/api/health")
-    print(f"  Internal Health: https://your-domain.com/{args.study_name.lower().replace(' ', '_')}/internal/health")
-    
+        activate_services([api_service_name, internal_service_name])
+    
+    # Emit the summary as one write rather than one print per line
+    summary = [
+        "\n✅ Study setup completed successfully with separate services!",
+        f"📁 Study directory: {study_dir}",
+        f"🔧 API service name: {api_service_name} (Priority #1 - Data Collection)",
+        f"🔧 Internal web service name: {internal_service_name} (Priority #2 - Dashboard)",
+        "⚙️  Gunicorn workers: {} API, {} internal web".format(*get_worker_counts()),
+        f"🌐 Nginx config: {nginx_file}",
+        f"🐍 Conda environment: {env_name}",
+        "\n📋 Next steps:",
+        f"1. Edit {study_dir / 'config' / 'study_config.json'} with your specific settings",
+        f"2. Start the API service: sudo systemctl start {api_service_name}",
+        f"3. Start the internal web service: sudo systemctl start {internal_service_name}",
+        f"4. Check status: sudo systemctl status {api_service_name} {internal_service_name}",
+        f"5. View logs: sudo journalctl -u {api_service_name} -f",
+        f"6. View internal logs: sudo journalctl -u {internal_service_name} -f",
+        f"7. Set up cron jobs: {study_dir}/scripts/setup_cron_jobs.sh --user {args.user} --env {env_name}",
+        "\n🌐 Access URLs:",
+        f"  API: https://your-domain.com/{slugs.underscore}/api/v1/",
+        f"  Dashboard: https://your-domain.com/{slugs.underscore}/internal_web",
+        f"  API Health: https://your-domain.com/{slugs.underscore}/api/health",
+        f"  Internal Health: https://your-domain.com/{slugs.underscore}/internal/health",
+    ]
     if admin_password:
-        print(f"\n🔐 Internal Web Login:")
-        print(f"  Username: admin")
-        print(f"  Password: {admin_password}")
-        print(f"  ⚠️  Save this password securely!")
-    
-    print(f"\n🛡️  Reliability Benefits:")
-    print(f"  • API service isolated from dashboard bugs")
-    print(f"  • Data collection continues even if dashboard fails")
-    print(f"  • Independent scaling and monitoring")
-    print(f"  • Separate log files for easier debugging")
-    
-    print(f"\n📊 Data Processing:")
-    print(f"  • Processing scripts available in: {study_dir}/scripts/")
-    print(f"  • Manual processing: {study_dir}/scripts/process_data.sh --action process_data")
-    print(f"  • Generate summaries: {study_dir}/scripts/generate_summaries.sh")
-    print(f"  • Process Garmin files: {study_dir}/scripts/process_data.sh --action process_garmin")
+        summary += [
+            "\n🔐 Internal Web Login:",
+            "  Username: admin",
+            f"  Password: {admin_password}",
+            "  ⚠️  Save this password securely!",
+        ]
+    summary += [
+        "\n🛡️  Reliability Benefits:",
+        "  • API service isolated from dashboard bugs",
+        "  • Data collection continues even if dashboard fails",
+        "  • Independent scaling and monitoring",
+        "  • Separate log files for easier debugging",
+        "\n📊 Data Processing:",
+        f"  • Processing scripts available in: {study_dir}/scripts/",
+        f"  • Manual processing: {study_dir}/scripts/process_data.sh --action process_data",
+        f"  • Generate summaries: {study_dir}/scripts/generate_summaries.sh",
+        f"  • Process Garmin files: {study_dir}/scripts/process_data.sh --action process_garmin",
+    ]
+    sys.stdout.write("\n".join(summary) + "\n")
 
 
 if __name__ == "__main__":
@@ -20,22 +20,240 @@ Example:
 
 import argparse
 import subprocess
+import shlex
+import re
 import sys
 import os
+import pwd
+import grp
 import json
 import random
 import string
+from string import Template
 from pathlib import Path
+from dataclasses import dataclass
 import shutil
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import urllib.request
 import tarfile
 import tempfile
 
+try:
+    # Optional: orjson serializes faster and returns bytes directly
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dump_json_bytes(data):
+    """Serialize data as indented JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+# pip arguments for unattended installs: never prompt, and skip pip's own
+# version check, which otherwise makes a network request on every run
+PIP_INSTALL_ARGS = ("install", "--no-input", "--disable-pip-version-check")
+
 
-def run_command(command, check=True, capture_output=True, text=True):
-    """Run a shell command and return the result."""
+# Run with the study environment's python as: python -c ADMIN_CREATE_CODE <study_dir>,
+# with the password on stdin. Prints the result as one JSON line.
+ADMIN_CREATE_CODE = """import json
+import os
+import sys
+
+study_path = sys.argv[1]
+sys.path.insert(0, os.path.join(study_path, "ubiwell-study-backend-core"))
+os.environ['STUDY_CONFIG_FILE'] = os.path.join(study_path, "config", "study_config.json")
+
+from study_framework_core.core.handlers import create_admin_user
+
+result = create_admin_user("admin", sys.stdin.read())
+print(json.dumps({"success": bool(result.get("success")), "error": result.get("error")}))
+"""
+
+
+@dataclass(frozen=True)
+class StudySlugs:
+    """Names derived from the study name, computed in one place."""
+    dash: str
+    underscore: str
+    env_name: str
+    api_service: str
+    internal_service: str
+
+
+@functools.lru_cache(maxsize=None)
+def get_study_slugs(study_name):
+    """Return the StudySlugs for a study name."""
+    dash = study_name.lower().replace(' ', '-')
+    return StudySlugs(
+        dash=dash,
+        underscore=study_name.lower().replace(' ', '_'),
+        env_name=f"{dash}-env",
+        api_service=f"{dash}-api",
+        internal_service=f"{dash}-internal",
+    )
+
+
+# Templates for generated files, parsed once at import. string.Template keeps the
+# nginx/systemd braces literal; "$$" is needed for a literal dollar sign.
+GUNICORN_SERVICE_TEMPLATE = Template("""[Unit]
+Description=$description
+After=network.target
+
+[Service]
+Type=notify
+User=$username
+Group=$username
+WorkingDirectory=$study_dir
+Environment="PATH=$env_prefix/bin"
+Environment="PYTHONDONTWRITEBYTECODE=1"
+Environment="PYTHONUNBUFFERED=1"
+Environment="MALLOC_ARENA_MAX=2"
+Environment="OMP_NUM_THREADS=1"
+LimitNOFILE=65536
+ExecStart=$env_prefix/bin/gunicorn --workers $workers --worker-class gthread --threads $threads --preload --bind unix:/var/sockets/$service_name.sock -m 007 $wsgi_module:app --access-logfile $study_dir/logs/${log_prefix}_access.log --error-logfile $study_dir/logs/${log_prefix}_error.log
+KillMode=mixed
+TimeoutStopSec=5
+PrivateTmp=true
+
+[Install]
+WantedBy=multi-user.target
+""")
+
+NGINX_CONF_TEMPLATE = Template("""# Gunicorn sockets, with idle connections kept open for reuse
+upstream $service_name-api {
+    server unix:/var/sockets/$service_name-api.sock;
+    keepalive 32;
+}
+
+upstream $service_name-internal {
+    server unix:/var/sockets/$service_name-internal.sock;
+    keepalive 16;
+}
+
+server {
+    listen 80;
+    server_name _;
+    
+    # API endpoints
+    location /api/ {
+        include proxy_params;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_pass http://$service_name-api;
+    }
+    
+    # Internal web dashboard
+    location /internal_web/ {
+        include proxy_params;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_pass http://$service_name-internal;
+    }
+    
+    # Static files
+    location /static/ {
+        alias $study_dir/static/;
+        expires 30d;
+        add_header Cache-Control "public, immutable";
+        # Serve straight from the page cache and compress text assets
+        sendfile on;
+        tcp_nopush on;
+        open_file_cache max=1000 inactive=60s;
+        gzip on;
+        gzip_vary on;
+        gzip_min_length 1024;
+        gzip_types text/css application/javascript image/svg+xml;
+    }
+    
+    # Health checks
+    location /health {
+        return 200 "healthy\\n";
+        add_header Content-Type text/plain;
+    }
+}
+""")
+
+API_WSGI_TEMPLATE = Template("""#!/usr/bin/env python3
+\"\"\"
+API WSGI entry point for $study_name (Data Collection - Priority #1)
+\"\"\"
+
+import sys
+import os
+from pathlib import Path
+
+study_path = Path(__file__).parent
+submodule_path = study_path / "ubiwell-study-backend-core"
+sys.path.insert(0, str(submodule_path))
+
+os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
+
+from study_framework_core.core.config import get_config
+from study_framework_core.core.api import CoreAPIEndpoints
+from flask import Flask
+from flask_restful import Api
+
+config = get_config()
+
+app = Flask(__name__)
+api = Api(app, prefix='/api/v1')
+
+core_api = CoreAPIEndpoints(api, config.security.auth_key)
+
+if __name__ == "__main__":
+    app.run()
+""")
+
+INTERNAL_WSGI_TEMPLATE = Template("""#!/usr/bin/env python3
+\"\"\"
+Internal Web WSGI entry point for $study_name (Dashboard - Priority #2)
+\"\"\"
+
+import sys
+import os
+from pathlib import Path
+
+study_path = Path(__file__).parent
+submodule_path = study_path / "ubiwell-study-backend-core"
+sys.path.insert(0, str(submodule_path))
+
+os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
+
+from study_framework_core.core.internal_web import InternalWebBase, SimpleDashboard
+from flask import Flask
+
+template_dir = submodule_path / "study_framework_core" / "templates"
+app = Flask(__name__, template_folder=str(template_dir))
+
+dashboard = SimpleDashboard()
+
+internal_web = InternalWebBase(app, dashboard)
+
+if __name__ == "__main__":
+    app.run()
+""")
+
+
+def escape_docstring_text(text):
+    """Escape text for use inside a generated triple-quoted Python docstring."""
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def run_command(command, check=True, capture_output=True, text=True, cwd=None, input=None):
+    """Run a command without a shell and return the result.
+    
+    command may be an argv list or a plain string, which is split with shlex
+    (no pipes, redirects or globs). Use cwd instead of "cd ... &&". input, if
+    given, is passed to the command's stdin.
+    """
+    argv = shlex.split(command) if isinstance(command, str) else command
     try:
-        result = subprocess.run(command, check=check, capture_output=capture_output, text=text, shell=True)
+        result = subprocess.run(argv, check=check, capture_output=capture_output, text=text, cwd=cwd, input=input)
         return result
     except subprocess.CalledProcessError as e:
         if check:
@@ -43,6 +261,36 @@ def run_command(command, check=True, capture_output=True, text=True):
             print(f"Error: {e}")
             sys.exit(1)
         return e
+    except OSError as e:
+        # Missing executable: report it like the shell did (exit status 127)
+        if check:
+            print(f"❌ Error running command: {command}")
+            print(f"Error: {e}")
+            sys.exit(1)
+        return subprocess.CompletedProcess(argv, 127, "", str(e))
+
+
+def chown_tree(root, user):
+    """Recursively set user:user ownership on root (in-process equivalent of chown -R).
+    
+    Entries that already have the right owner are skipped, so re-runs only touch what changed.
+    """
+    uid = pwd.getpwnam(user).pw_uid
+    gid = grp.getgrnam(user).gr_gid
+    
+    def needs_chown(st):
+        return st.st_uid != uid or st.st_gid != gid
+    
+    if needs_chown(os.lstat(root)):
+        os.chown(root, uid, gid, follow_symlinks=False)
+    pending = [os.fspath(root)]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            for entry in it:
+                if needs_chown(entry.stat(follow_symlinks=False)):
+                    os.chown(entry.path, uid, gid, follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
 
 
 def check_redhat_system():
@@ -73,6 +321,38 @@ def check_root():
         sys.exit(1)
 
 
+def validate_environment(args):
+    """Check the arguments and target directories before any slow setup work.
+    
+    Reports every problem found at once and exits if there are any, so a bad
+    run fails in seconds instead of after the conda environment is built.
+    """
+    print("🔍 Running pre-flight checks...")
+    errors = []
+    
+    if not re.fullmatch(r"[A-Za-z0-9 _-]+", args.study_name):
+        errors.append(f"Invalid study name '{args.study_name}' (use letters, digits, spaces, '-' and '_')")
+    
+    if not str(args.db_port).isdigit() or not 0 < int(args.db_port) < 65536:
+        errors.append(f"Invalid MongoDB port: {args.db_port}")
+    
+    for directory in ("/etc/systemd/system", "/etc/nginx/conf.d"):
+        # Runs before nginx is installed, so check the nearest existing parent
+        existing = Path(directory)
+        while not existing.exists():
+            existing = existing.parent
+        if not os.access(existing, os.W_OK):
+            errors.append(f"Cannot write to {directory}")
+    
+    if errors:
+        print("❌ Pre-flight checks failed:")
+        for error in errors:
+            print(f"  - {error}")
+        sys.exit(1)
+    
+    print("✅ Pre-flight checks passed")
+
+
 def check_dependencies():
     """Check and install required system dependencies."""
     print("🔍 Checking system dependencies...")
@@ -126,8 +406,7 @@ gpgkey=https://www.mongodb.org/static/pgp/server-6.0.asc
 """
         
         # Write repository file
-        with open('/etc/yum.repos.d/mongodb-org-6.0.repo', 'w') as f:
-            f.write(mongodb_repo_content)
+        Path('/etc/yum.repos.d/mongodb-org-6.0.repo').write_bytes(mongodb_repo_content.encode('utf-8'))
         
         print("✅ MongoDB repository configured")
         
@@ -135,18 +414,17 @@ gpgkey=https://www.mongodb.org/static/pgp/server-6.0.asc
         print(f"⚠️ Warning: Could not configure MongoDB repository: {e}")
         print("📝 You may need to install MongoDB manually")
     
-    # Install other packages
-    for package in required_packages:
-        try:
-            run_command(f"{package_manager} install -y {package}")
-        except Exception as e:
-            if package == 'mongodb-org':
-                print(f"⚠️ Warning: Could not install MongoDB via package manager: {e}")
-                provide_mongodb_alternatives()
-                print("🔄 Continuing with setup... MongoDB can be installed later")
-            else:
-                print(f"❌ Error installing {package}: {e}")
-                raise e
+    # Install the other packages in one transaction, so the package manager
+    # loads its metadata once instead of once per package
+    run_command([package_manager, "install", "-y", *(p for p in required_packages if p != 'mongodb-org')],
+                capture_output=False)
+    
+    # MongoDB is installed on its own so a failure there does not stop the setup
+    result = run_command([package_manager, "install", "-y", "mongodb-org"], check=False, capture_output=False)
+    if result.returncode != 0:
+        print(f"⚠️ Warning: Could not install MongoDB via package manager (exit code {result.returncode})")
+        provide_mongodb_alternatives()
+        print("🔄 Continuing with setup... MongoDB can be installed later")
     
     print("✅ System dependencies installed")
 
@@ -176,6 +454,7 @@ def provide_mongodb_alternatives():
     print()
 
 
+@functools.lru_cache(maxsize=None)
 def check_anaconda():
     """Check for existing Anaconda installation or install if needed."""
     print("🐍 Checking Anaconda installation...")
@@ -195,14 +474,13 @@ def check_anaconda():
     # Check for existing installations
     for path_pattern in possible_paths:
         if '*' in path_pattern:
-            # Handle wildcard paths
+            # Handle wildcard paths (glob only yields paths that exist)
             import glob
-            for path in glob.glob(path_pattern):
-                if os.path.exists(path):
-                    # Get the base conda directory (remove /bin/conda)
-                    conda_dir = os.path.dirname(os.path.dirname(path))
-                    print(f"🔍 Found conda at: {path} -> Base directory: {conda_dir}")
-                    found_installations.append(conda_dir)
+            for path in glob.iglob(path_pattern):
+                # Get the base conda directory (remove /bin/conda)
+                conda_dir = os.path.dirname(os.path.dirname(path))
+                print(f"🔍 Found conda at: {path} -> Base directory: {conda_dir}")
+                found_installations.append(conda_dir)
         else:
             if os.path.exists(path_pattern):
                 # Get the base conda directory (remove /bin/conda)
@@ -260,26 +538,129 @@ def check_anaconda():
             print("❌ Invalid choice. Please try again.")
 
 
+def download_file(url, dest, chunk_size=1024 * 1024):
+    """Stream url to dest in chunks, resuming a partial download if one exists.
+    
+    A partial file is only resumed with If-Range set to the ETag (or
+    Last-Modified) saved when it was started, so a file that changed upstream
+    in the meantime is downloaded again from the start instead of spliced.
+    
+    Returns the SHA256 hex digest of the complete file.
+    """
+    import hashlib
+    import urllib.error
+    
+    digest = hashlib.sha256()
+    validator_path = f"{dest}.validator"
+    existing = os.path.getsize(dest) if os.path.exists(dest) else 0
+    validator = None
+    if existing and os.path.exists(validator_path):
+        with open(validator_path) as f:
+            validator = f.read().strip() or None
+    headers = {'Range': f'bytes={existing}-', 'If-Range': validator} if validator else {}
+    
+    try:
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as e:
+        if e.code != 416:
+            raise
+        # Range not satisfiable: the leftover file is not a usable prefix, start over
+        os.remove(dest)
+        os.remove(validator_path)
+        return download_file(url, dest, chunk_size)
+    
+    with response:
+        if validator and response.status == 206:
+            print(f"  Resuming download from {existing // (1024 * 1024)} MB")
+            mode = 'ab'
+            with open(dest, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+        else:
+            # Full response: remember its validator so an interrupted download can be resumed
+            mode = 'wb'
+            validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            if validator:
+                with open(validator_path, 'w') as f:
+                    f.write(validator + "\n")
+            elif os.path.exists(validator_path):
+                os.remove(validator_path)
+        
+        with open(dest, mode) as f:
+            for chunk in iter(lambda: response.read(chunk_size), b''):
+                f.write(chunk)
+                digest.update(chunk)
+    
+    # Complete; the cached copy is tracked by its SHA256 from here on
+    if os.path.exists(validator_path):
+        os.remove(validator_path)
+    return digest.hexdigest()
+
+
+# Downloaded installers are kept here so re-runs on the same host can reuse them
+INSTALLER_CACHE_DIR = "/var/cache/study-framework"
+
+
+def fetch_cached_installer(url, filename):
+    """Return the path of a cached copy of url, downloading it only if needed.
+    
+    A completed download is recorded in a .sha256 file next to it; the cached
+    copy is reused while its hash still matches, and a partial one is resumed.
+    """
+    import hashlib
+    
+    os.makedirs(INSTALLER_CACHE_DIR, exist_ok=True)
+    installer_path = os.path.join(INSTALLER_CACHE_DIR, filename)
+    digest_path = f"{installer_path}.sha256"
+    
+    if os.path.exists(installer_path) and os.path.exists(digest_path):
+        with open(digest_path) as f:
+            expected = f.read().strip()
+        digest = hashlib.sha256()
+        with open(installer_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        if digest.hexdigest() == expected:
+            print(f"✅ Using cached installer: {installer_path}")
+            return installer_path
+        # Stale or corrupted copy: download it again from scratch
+        os.remove(installer_path)
+    
+    print(f"📥 Downloading {url}...")
+    installer_sha256 = download_file(url, installer_path)
+    with open(digest_path, 'w') as f:
+        f.write(installer_sha256 + "\n")
+    print(f"  SHA256: {installer_sha256}")
+    return installer_path
+
+
+def discard_cached_installer(installer_path):
+    """Remove a cached installer and its recorded hash so the next run downloads it again."""
+    for path in (installer_path, f"{installer_path}.sha256"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
 def install_anaconda():
     """Install Miniconda automatically."""
     print("📦 Installing Miniconda...")
     
-    # Download Miniconda
+    # Download Miniconda (cached between runs, partial downloads are resumed)
     miniconda_url = "https://repo.anaconda.com/miniconda/Miniconda3-latest-Linux-x86_64.sh"
-    installer_path = "/tmp/miniconda_installer.sh"
-    
-    print(f"📥 Downloading Miniconda from {miniconda_url}")
-    urllib.request.urlretrieve(miniconda_url, installer_path)
+    installer_path = fetch_cached_installer(miniconda_url, "Miniconda3-latest-Linux-x86_64.sh")
     
     # Make installer executable
     os.chmod(installer_path, 0o755)
     
     # Install Miniconda to /opt/anaconda3
     install_dir = "/opt/anaconda3"
-    run_command(f"bash {installer_path} -b -p {install_dir} -u")
-    
-    # Clean up installer
-    os.remove(installer_path)
+    result = run_command(["bash", installer_path, "-b", "-p", install_dir, "-u"], check=False)
+    if result.returncode != 0:
+        # The cached copy may be what is broken; don't reuse it next time
+        discard_cached_installer(installer_path)
+        print(f"❌ Miniconda installer failed (exit code {result.returncode})")
+        print(f"Error: {result.stderr}")
+        sys.exit(1)
     
     # Add to system PATH
     conda_init_script = f"""
@@ -288,8 +669,7 @@ def install_anaconda():
 export PATH="{install_dir}/bin:$PATH"
 """
     
-    with open('/etc/profile.d/conda.sh', 'w') as f:
-        f.write(conda_init_script)
+    Path('/etc/profile.d/conda.sh').write_bytes(conda_init_script.encode('utf-8'))
     
     os.chmod('/etc/profile.d/conda.sh', 0o644)
     
@@ -302,59 +682,57 @@ def create_user(username):
     print(f"👤 Creating user: {username}")
     
     # Check if user already exists
-    result = run_command(f"id {username}", check=False)
+    result = run_command(["id", username], check=False)
     if result.returncode == 0:
         print(f"✅ User {username} already exists")
         return
     
     # Create user with home directory
-    run_command(f"useradd -m -s /bin/bash {username}")
+    run_command(["useradd", "-m", "-s", "/bin/bash", username])
     
     # Add user to appropriate groups
-    run_command(f"usermod -a -G nginx {username}")
+    run_command(["usermod", "-a", "-G", "nginx", username])
     
     print(f"✅ User {username} created")
 
 
+# Study subdirectories, listed parents before children
+STUDY_SUBDIRS = (
+    "logs",
+    "data",
+    "static",
+    "static/css",
+    "static/js",
+    "uploads",
+    "config",
+    "templates",
+    "scripts",
+    "data_uploads",
+    "data_uploads/uploads",
+    "data_uploads/processed",
+    "data_uploads/exceptions",
+    "data_uploads/logs",
+    "active_sensing",
+    "ema_surveys",
+    "config-files",
+    "config-files/global",
+)
+
+
 def create_directory_structure(study_name, username, base_dir="/opt/studies"):
     """Create the study directory structure."""
     print(f"📁 Creating directory structure...")
     
+    slugs = get_study_slugs(study_name)
+    
     # If base_dir is a full path (contains the study name), use it directly
-    if study_name.lower().replace(" ", "_") in base_dir.lower() or study_name.lower().replace(" ", "-") in base_dir.lower():
+    if slugs.underscore in base_dir.lower() or slugs.dash in base_dir.lower():
         study_dir = Path(base_dir)
     else:
         # Otherwise, append study name to base_dir (use hyphens for consistency)
-        study_dir = Path(base_dir) / study_name.lower().replace(" ", "-")
-    
-    # Create base directory
-    study_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create subdirectories
-    directories = [
-        "logs",
-        "data",
-        "static",
-        "uploads",
-        "config",
-        "templates",
-        "scripts",
-        "static/css",
-        "static/js",
-        "data_uploads/uploads",
-        "data_uploads/processed",
-        "data_uploads/exceptions",
-        "data_uploads/logs",
-        "active_sensing",
-        "ema_surveys",
-        "config-files/global"
-    ]
+        study_dir = Path(base_dir) / slugs.dash
     
-    for subdir in directories:
-        (study_dir / subdir).mkdir(parents=True, exist_ok=True)
-    
-    # Set ownership
-    run_command(f"chown -R {username}:{username} {study_dir}")
+    create_directory_structure_in_path(study_dir, username)
     
     print(f"✅ Directory structure created: {study_dir}")
     return study_dir
@@ -367,63 +745,109 @@ def create_directory_structure_in_path(study_dir, username):
     # Create base directory
     study_dir.mkdir(parents=True, exist_ok=True)
     
-    # Create subdirectories
-    directories = [
-        "logs",
-        "data",
-        "static",
-        "uploads",
-        "config",
-        "templates",
-        "scripts",
-        "static/css",
-        "static/js",
-        "data_uploads/uploads",
-        "data_uploads/processed",
-        "data_uploads/exceptions",
-        "data_uploads/logs",
-        "active_sensing",
-        "ema_surveys",
-        "config-files/global"
-    ]
+    # Create subdirectories (parents first, so each mkdir is a single call)
+    for directory in STUDY_SUBDIRS:
+        (study_dir / directory).mkdir(exist_ok=True)
     
-    for directory in directories:
-        dir_path = study_dir / directory
-        dir_path.mkdir(parents=True, exist_ok=True)
-        # Set ownership
-        run_command(f"chown -R {username}:{username} {dir_path}")
+    # Set ownership once for the whole tree
+    chown_tree(study_dir, username)
     
     print(f"✅ Directory structure created in: {study_dir}")
 
 
+@functools.lru_cache(maxsize=None)
+def list_conda_envs(conda_path):
+    """Return the names of existing conda environments (cached; call cache_clear() after changes)."""
+    result = run_command([f"{conda_path}/bin/conda", "env", "list", "--json"], check=False)
+    try:
+        prefixes = json.loads(result.stdout).get("envs", [])
+    except (ValueError, AttributeError):
+        prefixes = []
+    # Match on the prefix directory name; the base install itself is not a study env
+    base_dir = os.path.normpath(conda_path)
+    return frozenset(Path(prefix).name for prefix in prefixes if os.path.normpath(prefix) != base_dir)
+
+
+@functools.lru_cache(maxsize=None)
+def get_solver_args(conda_path):
+    """Return the arguments selecting the libmamba solver, if this conda install has it.
+    
+    libmamba is much faster than the classic solver on fresh environments; it is the
+    default since conda 23.10, and older installs may have it as a plugin.
+    """
+    if any(Path(conda_path).glob("lib/python*/site-packages/conda_libmamba_solver")):
+        return ("--solver", "libmamba")
+    return ()
+
+
+# Created in the conda install once its channel Terms of Service are accepted
+CONDA_TOS_SENTINEL = ".conda-tos-accepted"
+
+
+@functools.lru_cache(maxsize=None)
+def accept_conda_tos(conda_path):
+    """Accept the default channels' Terms of Service, skipping it if already done for this install."""
+    sentinel = Path(conda_path) / CONDA_TOS_SENTINEL
+    if sentinel.exists():
+        print(f"✅ Conda Terms of Service already accepted")
+        return
+    
+    print(f"🔧 Accepting conda Terms of Service...")
+    # Both channels in one conda invocation
+    tos_result = run_command([f"{conda_path}/bin/conda", "tos", "accept", "--override-channels",
+                              "--channel", "https://repo.anaconda.com/pkgs/main",
+                              "--channel", "https://repo.anaconda.com/pkgs/r"], check=False)
+    
+    if tos_result.returncode == 0:
+        print(f"✅ Terms of Service accepted successfully")
+        sentinel.touch()
+    else:
+        print(f"⚠️ TOS acceptance may have failed, but continuing...")
+        print(f"Debug - TOS: {tos_result.stdout} {tos_result.stderr}")
+
+
+def env_pip_path(conda_path, env_name):
+    """Return the path of the environment's pip, which is run directly instead of through `conda run`."""
+    return f"{conda_path}/envs/{env_name}/bin/pip"
+
+
+def env_python_version(conda_path, env_name):
+    """Run the environment's python --version directly, without `conda run` activation.
+    
+    Environments live in {conda_path}/envs (create_conda_environment configures
+    envs_dirs that way), which is also the prefix the systemd units use.
+    """
+    return run_command([f"{conda_path}/envs/{env_name}/bin/python", "--version"], check=False)
+
+
 def create_conda_environment(conda_path, study_name, username, python_version="3.9"):
     """Create conda environment for the study."""
-    env_name = f"{study_name.lower().replace(' ', '-')}-env"
+    env_name = get_study_slugs(study_name).env_name
     print(f"🐍 Creating conda environment: {env_name}")
     
     # Check if environment already exists
-    result = run_command(f"{conda_path}/bin/conda env list", check=False)
-    if env_name in result.stdout:
+    if env_name in list_conda_envs(conda_path):
         print(f"✅ Environment {env_name} already exists")
         # Verify it's actually accessible
         print(f"🔍 Testing environment accessibility...")
-        test_result = run_command(f"{conda_path}/bin/conda run -n {env_name} python --version", check=False)
+        test_result = env_python_version(conda_path, env_name)
         if test_result.returncode == 0:
             print(f"✅ Environment {env_name} is accessible: {test_result.stdout.strip()}")
             return env_name
         else:
             print(f"⚠️ Environment {env_name} exists but is not accessible")
-            print(f"Debug - conda run output: {test_result.stdout}")
-            print(f"Debug - conda run error: {test_result.stderr}")
+            print(f"Debug - python output: {test_result.stdout}")
+            print(f"Debug - python error: {test_result.stderr}")
             print(f"🔧 Recreating environment...")
-            print(f"💡 Manual test command: {conda_path}/bin/conda run -n {env_name} python --version")
+            print(f"💡 Manual test command: {conda_path}/envs/{env_name}/bin/python --version")
             # Remove the broken environment from both locations
-            run_command(f"{conda_path}/bin/conda env remove -n {env_name} -y", check=False)
+            run_command([f"{conda_path}/bin/conda", "env", "remove", "-n", env_name, "-y"], check=False)
+            list_conda_envs.cache_clear()
             # Also remove from user directory if it exists there
             user_env_path = f"/home/{username}/.conda/envs/{env_name}"
             if os.path.exists(user_env_path):
                 print(f"🧹 Removing user environment: {user_env_path}")
-                run_command(f"rm -rf {user_env_path}", check=False)
+                shutil.rmtree(user_env_path, ignore_errors=True)
     
     # Create environment
     print(f"🔧 Creating conda environment with Python {python_version}...")
@@ -432,47 +856,38 @@ def create_conda_environment(conda_path, study_name, username, python_version="3
     print(f"🔧 Configuring conda to use system environments...")
     
     # Check current conda configuration
-    config_result = run_command(f"{conda_path}/bin/conda config --show envs_dirs", check=False)
+    config_result = run_command([f"{conda_path}/bin/conda", "config", "--show", "envs_dirs"], check=False)
     print(f"🔍 Current conda envs_dirs: {config_result.stdout}")
     
     # Reset conda configuration to use only system directory
     print(f"🔧 Resetting conda configuration...")
     
     # Clear all existing envs_dirs
-    run_command(f"{conda_path}/bin/conda config --remove-key envs_dirs", check=False)
+    run_command([f"{conda_path}/bin/conda", "config", "--remove-key", "envs_dirs"], check=False)
     
     # Set only the system environment directory
-    run_command(f"{conda_path}/bin/conda config --add envs_dirs {conda_path}/envs", check=False)
+    run_command([f"{conda_path}/bin/conda", "config", "--add", "envs_dirs", f"{conda_path}/envs"], check=False)
     
     # Ensure the envs directory exists and has proper permissions
     envs_dir = f"{conda_path}/envs"
     if not os.path.exists(envs_dir):
         print(f"🔧 Creating envs directory: {envs_dir}")
-        run_command(f"mkdir -p {envs_dir}")
+        Path(envs_dir).mkdir(parents=True, exist_ok=True)
     
     # Set proper ownership
-    run_command(f"chown -R {username}:{username} {envs_dir}")
-    
-    # Accept Terms of Service for conda channels
-    print(f"🔧 Accepting conda Terms of Service...")
-    tos_result1 = run_command(f"{conda_path}/bin/conda tos accept --override-channels --channel https://repo.anaconda.com/pkgs/main", check=False)
-    tos_result2 = run_command(f"{conda_path}/bin/conda tos accept --override-channels --channel https://repo.anaconda.com/pkgs/r", check=False)
+    chown_tree(envs_dir, username)
     
-    if tos_result1.returncode == 0 and tos_result2.returncode == 0:
-        print(f"✅ Terms of Service accepted successfully")
-    else:
-        print(f"⚠️ TOS acceptance may have failed, but continuing...")
-        print(f"Debug - TOS main: {tos_result1.stdout} {tos_result1.stderr}")
-        print(f"Debug - TOS r: {tos_result2.stdout} {tos_result2.stderr}")
+    # Accept Terms of Service for conda channels (once per conda install)
+    accept_conda_tos(conda_path)
     
     # Verify configuration
-    final_config = run_command(f"{conda_path}/bin/conda config --show envs_dirs", check=False)
+    final_config = run_command([f"{conda_path}/bin/conda", "config", "--show", "envs_dirs"], check=False)
     print(f"🔍 Updated conda envs_dirs: {final_config.stdout}")
     
     # Create environment in system location
     print(f"🔧 Creating conda environment in system location...")
     try:
-        result = run_command(f"{conda_path}/bin/conda create -n {env_name} python={python_version} -y", check=False)
+        result = run_command([f"{conda_path}/bin/conda", "create", *get_solver_args(conda_path), "-n", env_name, f"python={python_version}", "-y"], check=False)
         if result.returncode != 0:
             print(f"❌ Conda create failed with return code: {result.returncode}")
             print(f"Debug - conda create output: {result.stdout}")
@@ -484,19 +899,19 @@ def create_conda_environment(conda_path, study_name, username, python_version="3
         raise e
     
     # Verify environment was created
-    result = run_command(f"{conda_path}/bin/conda env list", check=False)
-    if env_name not in result.stdout:
+    list_conda_envs.cache_clear()
+    if env_name not in list_conda_envs(conda_path):
         print(f"❌ Failed to create conda environment: {env_name}")
-        print(f"Debug - conda env list output: {result.stdout}")
+        print(f"Debug - conda environments: {', '.join(sorted(list_conda_envs(conda_path)))}")
         raise Exception(f"Could not create conda environment: {env_name}")
     
     # Set ownership of conda environments directory
     conda_envs_dir = f"{conda_path}/envs"
     if os.path.exists(conda_envs_dir):
-        run_command(f"chown -R {username}:{username} {conda_envs_dir}")
+        chown_tree(conda_envs_dir, username)
     
     # Final verification that the environment works
-    final_test = run_command(f"{conda_path}/bin/conda run -n {env_name} python --version", check=False)
+    final_test = env_python_version(conda_path, env_name)
     if final_test.returncode != 0:
         print(f"❌ Environment creation failed - cannot access {env_name}")
         print(f"Debug - final test output: {final_test.stdout}")
@@ -521,17 +936,19 @@ def install_packages(conda_path, env_name, study_dir):
     
     # First, verify the environment exists and is accessible
     print(f"🔍 Verifying conda environment: {env_name}")
-    result = run_command(f"{conda_path}/bin/conda run -n {env_name} python --version", check=False)
+    result = env_python_version(conda_path, env_name)
     if result.returncode != 0:
         print(f"❌ Cannot access conda environment: {env_name}")
-        print(f"Debug - conda run output: {result.stdout}")
-        print(f"Debug - conda run error: {result.stderr}")
+        print(f"Debug - python output: {result.stdout}")
+        print(f"Debug - python error: {result.stderr}")
         raise Exception(f"Conda environment {env_name} is not accessible")
     print(f"✅ Conda environment is accessible: {result.stdout.strip()}")
     
     if requirements_path.exists():
         print(f"📦 Installing requirements from: {requirements_path}")
-        run_command(f"{conda_path}/bin/conda run -n {env_name} pip install -r {requirements_path}")
+        # Not captured, so pip's progress streams to the terminal as it happens
+        run_command([env_pip_path(conda_path, env_name), *PIP_INSTALL_ARGS, "-r", str(requirements_path)],
+                    capture_output=False)
     else:
         print("⚠️ requirements.txt not found, installing individual packages")
         packages = [
@@ -548,15 +965,16 @@ def install_packages(conda_path, env_name, study_dir):
             "geopy"
         ]
         
-        for package in packages:
-            print(f"📦 Installing {package}...")
-            try:
-                run_command(f"{conda_path}/bin/conda run -n {env_name} pip install {package}")
-                print(f"✅ Successfully installed {package}")
-            except Exception as e:
-                print(f"❌ Failed to install {package}: {e}")
-                print(f"💡 You may need to install this package manually later")
-                # Continue with other packages instead of failing completely
+        # One pip run resolves all packages together instead of one pip run per package
+        print(f"📦 Installing {', '.join(packages)}...")
+        result = run_command([env_pip_path(conda_path, env_name), *PIP_INSTALL_ARGS, *packages],
+                             check=False, capture_output=False)
+        if result.returncode == 0:
+            print(f"✅ Successfully installed {len(packages)} packages")
+        else:
+            print(f"❌ Failed to install packages (pip exit code {result.returncode}, see output above)")
+            print(f"💡 You may need to install these packages manually later")
+            # Continue with the setup instead of failing completely
     
     # Install the framework in editable mode
     print("📦 Installing study-framework-core in editable mode...")
@@ -576,12 +994,12 @@ def install_packages(conda_path, env_name, study_dir):
         print(f"🔧 Attempting to initialize submodule...")
         
         # Check if submodule is configured
-        submodule_result = run_command(f"cd {study_dir} && git submodule status", check=False)
+        submodule_result = run_command("git submodule status", check=False, cwd=study_dir)
         print(f"🔍 Submodule status: {submodule_result.stdout}")
         
         # Try to initialize the submodule
         try:
-            init_result = run_command(f"cd {study_dir} && git submodule update --init --recursive", check=False)
+            init_result = run_command("git submodule update --init --recursive", check=False, cwd=study_dir)
             print(f"🔍 Submodule init output: {init_result.stdout}")
             if init_result.stderr:
                 print(f"🔍 Submodule init error: {init_result.stderr}")
@@ -611,25 +1029,25 @@ def install_packages(conda_path, env_name, study_dir):
     try:
         # Change to the submodule directory and install from there
         print(f"🔧 Installing framework from submodule directory...")
-        result = run_command(f"cd {submodule_path} && {conda_path}/bin/conda run -n {env_name} pip install -e .", check=False)
+        result = run_command([env_pip_path(conda_path, env_name), *PIP_INSTALL_ARGS, "-e", "."], check=False, cwd=submodule_path)
         if result.returncode != 0:
             print(f"❌ Framework installation failed with return code: {result.returncode}")
             print(f"Debug - pip install output: {result.stdout}")
             print(f"Debug - pip install error: {result.stderr}")
-            print(f"💡 Manual test command: cd {submodule_path} && {conda_path}/bin/conda run -n {env_name} pip install -e .")
+            print(f"💡 Manual test command: cd {submodule_path} && {env_pip_path(conda_path, env_name)} install -e .")
             raise Exception(f"Framework installation failed: {result.stderr}")
         else:
             print(f"✅ Framework installed successfully")
     except Exception as e:
         print(f"❌ Error installing framework: {e}")
         print(f"💡 You may need to install the framework manually later")
-        print(f"💡 Manual command: cd {submodule_path} && {conda_path}/bin/conda run -n {env_name} pip install -e .")
+        print(f"💡 Manual command: cd {submodule_path} && {env_pip_path(conda_path, env_name)} install -e .")
         print(f"💡 Alternative: Install from PyPI if available")
         # Don't raise exception, continue with setup
         print(f"⚠️ Continuing setup without framework installation...")
         print(f"📝 Note: You can install the framework later by running:")
         print(f"   cd {submodule_path}")
-        print(f"   {conda_path}/bin/conda run -n {env_name} pip install -e .")
+        print(f"   {env_pip_path(conda_path, env_name)} install -e .")
     
     print("✅ All packages installed successfully")
 
@@ -681,8 +1099,7 @@ def create_config_file(study_dir, study_name, db_username, db_password, db_name,
     }
     
     config_file = study_dir / "config" / "study_config.json"
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2)
+    config_file.write_bytes(dump_json_bytes(config))
     
     print(f"✅ Configuration file created: {config_file}")
 
@@ -692,156 +1109,97 @@ def create_wsgi_files(study_dir, study_name):
     print(f"🐍 Creating WSGI files...")
     
     # API WSGI file
-    api_wsgi_content = f"""#!/usr/bin/env python3
-\"\"\"
-API WSGI entry point for {study_name} (Data Collection - Priority #1)
-\"\"\"
-
-import sys
-import os
-from pathlib import Path
-
-study_path = Path(__file__).parent
-submodule_path = study_path / "ubiwell-study-backend-core"
-sys.path.insert(0, str(submodule_path))
-
-os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
-
-from study_framework_core.core.config import get_config
-from study_framework_core.core.api import CoreAPIEndpoints
-from flask import Flask
-from flask_restful import Api
-
-config = get_config()
-
-app = Flask(__name__)
-api = Api(app, prefix='/api/v1')
-
-core_api = CoreAPIEndpoints(api, config.security.auth_key)
-
-if __name__ == "__main__":
-    app.run()
-"""
+    api_wsgi_content = API_WSGI_TEMPLATE.substitute(study_name=escape_docstring_text(study_name))
     
     api_wsgi_file = study_dir / "api_wsgi.py"
-    api_wsgi_file.write_text(api_wsgi_content)
+    api_wsgi_file.write_bytes(api_wsgi_content.encode('utf-8'))
     os.chmod(api_wsgi_file, 0o755)
     print(f"✅ Created API WSGI file: {api_wsgi_file}")
     
     # Internal Web WSGI file
-    internal_wsgi_content = f"""#!/usr/bin/env python3
-\"\"\"
-Internal Web WSGI entry point for {study_name} (Dashboard - Priority #2)
-\"\"\"
-
-import sys
-import os
-from pathlib import Path
-
-study_path = Path(__file__).parent
-submodule_path = study_path / "ubiwell-study-backend-core"
-sys.path.insert(0, str(submodule_path))
-
-os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
-
-from study_framework_core.core.config import get_config
-from study_framework_core.core.internal_web import InternalWebBase, SimpleDashboard
-from flask import Flask
-
-config = get_config()
+    internal_wsgi_content = INTERNAL_WSGI_TEMPLATE.substitute(study_name=escape_docstring_text(study_name))
+    
+    internal_wsgi_file = study_dir / "internal_wsgi.py"
+    internal_wsgi_file.write_bytes(internal_wsgi_content.encode('utf-8'))
+    os.chmod(internal_wsgi_file, 0o755)
+    print(f"✅ Created Internal Web WSGI file: {internal_wsgi_file}")
 
-template_dir = submodule_path / "study_framework_core" / "templates"
-app = Flask(__name__, template_folder=str(template_dir))
 
-dashboard = SimpleDashboard()
+# Threads per gunicorn worker; requests mostly wait on MongoDB, so a thread
+# serves the next one instead of the whole worker process blocking
+API_THREADS = 8
+INTERNAL_THREADS = 4
 
-internal_web = InternalWebBase(app, dashboard)
 
-if __name__ == "__main__":
-    app.run()
-"""
+def get_worker_counts():
+    """Return (api_workers, internal_workers) gunicorn worker counts for this host.
     
-    internal_wsgi_file = study_dir / "internal_wsgi.py"
-    internal_wsgi_file.write_text(internal_wsgi_content)
-    os.chmod(internal_wsgi_file, 0o755)
-    print(f"✅ Created Internal Web WSGI file: {internal_wsgi_file}")
+    The API gets the usual 2 * CPUs + 1 (capped at 16); the dashboard sees far
+    less traffic, so it gets half the CPUs with a minimum of two.
+    """
+    cpu = os.cpu_count() or 2
+    return min(2 * cpu + 1, 16), max(2, cpu // 2)
 
 
 def create_systemd_services(study_name, study_dir, conda_path, env_name, username):
     """Create systemd services for the Flask applications."""
     print(f"🔧 Creating systemd services...")
     
+    slugs = get_study_slugs(study_name)
+    
     # Create socket directory
     socket_dir = "/var/sockets"
     os.makedirs(socket_dir, exist_ok=True)
-    run_command(f"chown {username}:{username} {socket_dir}")
+    os.chown(socket_dir, pwd.getpwnam(username).pw_uid, grp.getgrnam(username).gr_gid)
     
-    # API service
-    api_service_content = f"""[Unit]
-Description=API Gunicorn instance to serve {study_name} (Data Collection - Priority #1)
-After=network.target
-
-[Service]
-Type=notify
-User={username}
-Group={username}
-WorkingDirectory={study_dir}
-Environment="PATH={conda_path}/envs/{env_name}/bin"
-ExecStart={conda_path}/envs/{env_name}/bin/gunicorn --workers 2 --bind unix:/var/sockets/{study_name.lower().replace(' ', '-')}-api.sock -m 007 api_wsgi:app --access-logfile {study_dir}/logs/api_access.log --error-logfile {study_dir}/logs/api_error.log
-ExecReload=/bin/kill -s HUP $MAINPID
-KillMode=mixed
-TimeoutStopSec=5
-PrivateTmp=true
-
-[Install]
-WantedBy=multi-user.target
-"""
+    env_prefix = f"{conda_path}/envs/{env_name}"
+    api_workers, internal_workers = get_worker_counts()
     
-    api_service_file = f"/etc/systemd/system/{study_name.lower().replace(' ', '-')}-api.service"
-    with open(api_service_file, 'w') as f:
-        f.write(api_service_content)
+    # API service
+    api_service_content = GUNICORN_SERVICE_TEMPLATE.substitute(
+        description=f"API Gunicorn instance to serve {study_name} (Data Collection - Priority #1)",
+        username=username,
+        study_dir=study_dir,
+        env_prefix=env_prefix,
+        service_name=slugs.api_service,
+        workers=api_workers,
+        threads=API_THREADS,
+        wsgi_module="api_wsgi",
+        log_prefix="api",
+    )
+    
+    api_service_file = f"/etc/systemd/system/{slugs.api_service}.service"
+    Path(api_service_file).write_bytes(api_service_content.encode('utf-8'))
     
     # Internal Web service
-    internal_service_content = f"""[Unit]
-Description=Internal Web Gunicorn instance to serve {study_name} (Dashboard - Priority #2)
-After=network.target
-
-[Service]
-Type=notify
-User={username}
-Group={username}
-WorkingDirectory={study_dir}
-Environment="PATH={conda_path}/envs/{env_name}/bin"
-ExecStart={conda_path}/envs/{env_name}/bin/gunicorn --workers 2 --bind unix:/var/sockets/{study_name.lower().replace(' ', '-')}-internal.sock -m 007 internal_wsgi:app --access-logfile {study_dir}/logs/internal_access.log --error-logfile {study_dir}/logs/internal_error.log
-ExecReload=/bin/kill -s HUP $MAINPID
-KillMode=mixed
-TimeoutStopSec=5
-PrivateTmp=true
-
-[Install]
-WantedBy=multi-user.target
-"""
-    
-    internal_service_file = f"/etc/systemd/system/{study_name.lower().replace(' ', '-')}-internal.service"
-    with open(internal_service_file, 'w') as f:
-        f.write(internal_service_content)
+    internal_service_content = GUNICORN_SERVICE_TEMPLATE.substitute(
+        description=f"Internal Web Gunicorn instance to serve {study_name} (Dashboard - Priority #2)",
+        username=username,
+        study_dir=study_dir,
+        env_prefix=env_prefix,
+        service_name=slugs.internal_service,
+        workers=internal_workers,
+        threads=INTERNAL_THREADS,
+        wsgi_module="internal_wsgi",
+        log_prefix="internal",
+    )
+    
+    internal_service_file = f"/etc/systemd/system/{slugs.internal_service}.service"
+    Path(internal_service_file).write_bytes(internal_service_content.encode('utf-8'))
     
     # Reload systemd and enable services
     run_command("systemctl daemon-reload")
+    run_command(["systemctl", "enable", slugs.api_service, slugs.internal_service])
     
-    service_name = study_name.lower().replace(' ', '-')
-    run_command(f"systemctl enable {service_name}-api")
-    run_command(f"systemctl enable {service_name}-internal")
-    
-    print(f"✅ Created and enabled API service: {service_name}-api")
-    print(f"✅ Created and enabled internal web service: {service_name}-internal")
+    print(f"✅ Created and enabled API service: {slugs.api_service}")
+    print(f"✅ Created and enabled internal web service: {slugs.internal_service}")
 
 
 def create_nginx_config(study_name, study_dir):
     """Create Nginx configuration for the study."""
     print(f"🌐 Creating nginx configuration...")
     
-    service_name = study_name.lower().replace(' ', '-')
+    service_name = get_study_slugs(study_name).dash
     
     # Create proxy_params file if it doesn't exist
     proxy_params_path = "/etc/nginx/proxy_params"
@@ -854,50 +1212,23 @@ proxy_set_header X-Forwarded-Proto $scheme;
 proxy_redirect off;
 proxy_buffering off;
 """
-        with open(proxy_params_path, 'w') as f:
-            f.write(proxy_params_content)
+        Path(proxy_params_path).write_bytes(proxy_params_content.encode('utf-8'))
         print(f"✅ Created proxy_params file: {proxy_params_path}")
     
     # Fix nginx log permissions
     print(f"🔧 Fixing nginx log permissions...")
-    run_command("mkdir -p /var/log/nginx", check=False)
-    run_command("chown -R nginx:nginx /var/log/nginx", check=False)
-    run_command("chmod 755 /var/log/nginx", check=False)
-    
-    nginx_config = f"""server {{
-    listen 80;
-    server_name _;
-    
-    # API endpoints
-    location /api/ {{
-        include proxy_params;
-        proxy_pass http://unix:/var/sockets/{service_name}-api.sock;
-    }}
-    
-    # Internal web dashboard
-    location /internal_web/ {{
-        include proxy_params;
-        proxy_pass http://unix:/var/sockets/{service_name}-internal.sock;
-    }}
-    
-    # Static files
-    location /static/ {{
-        alias {study_dir}/static/;
-        expires 30d;
-        add_header Cache-Control "public, immutable";
-    }}
+    try:
+        Path("/var/log/nginx").mkdir(parents=True, exist_ok=True)
+        chown_tree("/var/log/nginx", "nginx")
+        os.chmod("/var/log/nginx", 0o755)
+    except (OSError, KeyError) as e:
+        # Missing nginx user/group or directory; nginx -t below reports real problems
+        print(f"⚠️ Could not fix nginx log permissions: {e}")
     
-    # Health checks
-    location /health {{
-        return 200 "healthy\\n";
-        add_header Content-Type text/plain;
-    }}
-}}
-"""
+    nginx_config = NGINX_CONF_TEMPLATE.substitute(service_name=service_name, study_dir=study_dir)
     
     nginx_file = f"/etc/nginx/conf.d/{service_name}.conf"
-    with open(nginx_file, 'w') as f:
-        f.write(nginx_config)
+    Path(nginx_file).write_bytes(nginx_config.encode('utf-8'))
     
     # Test and reload nginx
     print(f"🔧 Testing nginx configuration...")
@@ -925,8 +1256,7 @@ def setup_firewall():
     result = run_command("systemctl is-active firewalld", check=False)
     if result.returncode == 0:
         # Add HTTP and HTTPS to firewall
-        run_command("firewall-cmd --permanent --add-service=http")
-        run_command("firewall-cmd --permanent --add-service=https")
+        run_command("firewall-cmd --permanent --add-service=http --add-service=https")
         run_command("firewall-cmd --reload")
         print("✅ Firewall configured")
     else:
@@ -940,68 +1270,40 @@ def create_admin_user(study_dir, conda_path, env_name):
     # Generate random password
     password = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
     
-    # Create temporary script to create admin user
-    temp_script = f"""#!/usr/bin/env python3
-import sys
-import os
-from pathlib import Path
-
-# Add the submodule path
-study_path = Path(__file__).parent
-submodule_path = study_path / "ubiwell-study-backend-core"
-sys.path.insert(0, str(submodule_path))
-
-os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
-
-from study_framework_core.core.handlers import create_admin_user
-
-try:
-    create_admin_user("admin", "{password}")
-    print("✅ Admin user created successfully")
-    print("Username: admin")
-    print("Password: {password}")
-except Exception as e:
-    print("❌ Error creating admin user: " + str(e))
-    sys.exit(1)
-"""
-    
-    temp_script_path = study_dir / "temp_create_admin.py"
-    temp_script_path.write_text(temp_script)
-    os.chmod(temp_script_path, 0o755)
+    # Run the creation with the environment's python directly; the password goes
+    # over stdin (not argv, which other users can see) and the result comes back as JSON
+    python_path = f"{conda_path}/envs/{env_name}/bin/python"
     
     try:
-        print(f"🔧 Running admin user creation script...")
-        print(f"🔍 Script path: {temp_script_path}")
-        print(f"🔍 Conda path: {conda_path}")
-        print(f"🔍 Environment: {env_name}")
+        print(f"🔧 Running admin user creation...")
+        print(f"🔍 Python: {python_path}")
         
-        result = run_command(f"{conda_path}/bin/conda run -n {env_name} python {temp_script_path}", check=False)
+        result = run_command([python_path, "-c", ADMIN_CREATE_CODE, str(study_dir)], check=False, input=password)
         
-        if result.returncode == 0:
+        try:
+            outcome = json.loads(result.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            outcome = {"success": False, "error": result.stderr.strip() or f"exit code {result.returncode}"}
+        
+        if outcome["success"]:
             print(f"✅ Admin user created with password: {password}")
         else:
-            print(f"❌ Admin user creation failed with return code: {result.returncode}")
-            print(f"Debug - script output: {result.stdout}")
-            print(f"Debug - script error: {result.stderr}")
-            print(f"💡 Manual test command: {conda_path}/bin/conda run -n {env_name} python {temp_script_path}")
-            raise Exception(f"Admin user creation failed: {result.stderr}")
+            print(f"❌ Admin user creation failed: {outcome['error']}")
+            raise Exception(f"Admin user creation failed: {outcome['error']}")
             
     except Exception as e:
         print(f"⚠️ Warning: Could not create admin user automatically: {e}")
         print("💡 You can create the admin user manually later using:")
         print(f"   cd {study_dir}")
         print(f"   {conda_path}/bin/conda run -n {env_name} python ubiwell-study-backend-core/tests/create_admin_user.py")
-    finally:
-        # Clean up temporary script
-        if temp_script_path.exists():
-            print(f"🧹 Cleaning up temporary script: {temp_script_path}")
-            temp_script_path.unlink()
 
 
 def create_readme(study_dir, study_name, username):
     """Create a README file for the study."""
     print(f"📝 Creating README file...")
     
+    service_name = get_study_slugs(study_name).dash
+    
     readme_content = f"""# {study_name}
 
 This study was set up using the Study Framework Core.
@@ -1010,14 +1312,14 @@ This study was set up using the Study Framework Core.
 
 ### Start Services
 ```bash
-sudo systemctl start {study_name.lower().replace(' ', '-')}-api
-sudo systemctl start {study_name.lower().replace(' ', '-')}-internal
+sudo systemctl start {service_name}-api
+sudo systemctl start {service_name}-internal
 ```
 
 ### Check Status
 ```bash
-sudo systemctl status {study_name.lower().replace(' ', '-')}-api
-sudo systemctl status {study_name.lower().replace(' ', '-')}-internal
+sudo systemctl status {service_name}-api
+sudo systemctl status {service_name}-internal
 ```
 
 ### Access Dashboard
@@ -1044,12 +1346,15 @@ sudo systemctl status {study_name.lower().replace(' ', '-')}-internal
 Edit `config/study_config.json` to modify study settings.
 
 ## Updates
+The services load the app once at start-up (gunicorn `--preload`), so code and config
+changes need `systemctl restart`; `systemctl reload` does not pick them up.
+
 To update the framework:
 ```bash
 cd {study_dir}/ubiwell-study-backend-core
 git submodule update --remote
 python update_core.py --study-name "{study_name}"
-sudo systemctl restart {study_name.lower().replace(' ', '-')}-api {study_name.lower().replace(' ', '-')}-internal
+sudo systemctl restart {service_name}-api {service_name}-internal
 ```
 
 ## Support
@@ -1057,7 +1362,7 @@ For issues, check the logs in the `logs/` directory or contact the framework mai
 """
     
     readme_file = study_dir / "README.md"
-    readme_file.write_text(readme_content)
+    readme_file.write_bytes(readme_content.encode('utf-8'))
     
     print(f"✅ README file created: {readme_file}")
 
@@ -1095,6 +1400,9 @@ def main():
     # Check system requirements
     check_redhat_system()
     check_root()
+    
+    # Fail fast on bad input before any packages are installed
+    validate_environment(args)
     check_dependencies()
     
     # Setup Anaconda
@@ -1115,8 +1423,10 @@ def main():
     # Setup conda environment
     env_name = create_conda_environment(conda_path, args.study_name, args.user, args.python_version)
     
-    # Install packages
-    install_packages(conda_path, env_name, study_dir)
+    # Install packages; everything up to the admin user is independent of the
+    # installed packages, so it runs while pip does
+    install_pool = ThreadPoolExecutor(max_workers=1)
+    install_future = install_pool.submit(install_packages, conda_path, env_name, study_dir)
     
     # Create configuration
     create_config_file(study_dir, args.study_name, args.db_username, args.db_password, 
@@ -1125,7 +1435,8 @@ def main():
     # Create WSGI files
     create_wsgi_files(study_dir, args.study_name)
     
-    # Create systemd services
+    # Create systemd services (units are only enabled here, not started, so the
+    # environment's gunicorn does not have to exist yet)
     create_systemd_services(args.study_name, study_dir, conda_path, env_name, args.user)
     
     # Setup nginx
@@ -1134,6 +1445,10 @@ def main():
     # Setup firewall
     setup_firewall()
     
+    # The admin user is created with the framework, so wait for the install
+    install_future.result()
+    install_pool.shutdown()
+    
     # Create admin user
     create_admin_user(study_dir, conda_path, env_name)
     
@@ -1141,16 +1456,18 @@ def main():
     create_readme(study_dir, args.study_name, args.user)
     
     # Final setup
+    service_name = get_study_slugs(args.study_name).dash
     print("\n🎉 Setup Complete!")
     print(f"📁 Study directory: {study_dir}")
     print(f"🐍 Conda environment: {env_name}")
-    print(f"🔧 Services: {args.study_name.lower().replace(' ', '-')}-api, {args.study_name.lower().replace(' ', '-')}-internal")
+    print(f"🔧 Services: {service_name}-api, {service_name}-internal")
+    print("⚙️ Gunicorn workers: {} API, {} internal web".format(*get_worker_counts()))
     print()
     print("🚀 Next steps:")
     print("1. Start MongoDB: sudo systemctl start mongod")
-    print("2. Start services: sudo systemctl start {args.study_name.lower().replace(' ', '-')}-api {args.study_name.lower().replace(' ', '-')}-internal")
+    print(f"2. Start services: sudo systemctl start {service_name}-api {service_name}-internal")
     print("3. Access dashboard: http://your-server/internal_web/")
-    print("4. Check logs: tail -f {study_dir}/logs/*.log")
+    print(f"4. Check logs: tail -f {study_dir}/logs/*.log")
     print()
     print("📚 For more information, see the README.md file in the study directory.")
 
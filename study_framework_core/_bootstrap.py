@@ -0,0 +1,35 @@
+"""
+Process bootstrap for standalone study scripts.
+
+Helper scripts (admin user creation, debugging tools) need the framework
+submodule on ``sys.path`` and ``STUDY_CONFIG_FILE`` pointing at the study's
+config before any ``study_framework_core.core`` module is imported, because
+the configuration is read at import time. ``ensure_env`` does this once per
+process; later calls are no-ops.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+_ENV_READY = False
+
+
+def ensure_env(study_dir) -> None:
+    """Prepare sys.path and the config environment for the given study directory."""
+    global _ENV_READY
+    if _ENV_READY:
+        return
+
+    study_dir = Path(study_dir)
+    submodule_path = str(study_dir / "ubiwell-study-backend-core")
+    if submodule_path not in sys.path:
+        sys.path.insert(0, submodule_path)
+
+    os.environ['STUDY_CONFIG_FILE'] = str(study_dir / "config" / "study_config.json")
+
+    # Import the commonly used modules now so later imports are sys.modules hits
+    import study_framework_core.core.config  # noqa: F401
+    import study_framework_core.core.handlers  # noqa: F401
+
+    _ENV_READY = True
@@ -11,6 +11,26 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, asdict
 
+try:
+    # Optional: orjson parses noticeably faster than the stdlib json module
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Parsed config files keyed by (path, mtime_ns); entries must be treated as read-only
+_config_file_cache: Dict[tuple, Dict[str, Any]] = {}
+
+
+def _read_config_file(config_file: str) -> Dict[str, Any]:
+    """Read and parse a JSON config file, reusing the result while the file is unchanged."""
+    key = (config_file, os.stat(config_file).st_mtime_ns)
+    config_data = _config_file_cache.get(key)
+    if config_data is None:
+        with open(config_file, 'rb') as f:
+            config_data = _json_loads(f.read())
+        _config_file_cache[key] = config_data
+    return config_data
+
 
 # Collection names - centralized for consistency
 class CollectionNames:
@@ -134,21 +154,23 @@ class StudyFrameworkConfig:
     that are shared across all components of the study framework.
     """
     
-    def __init__(self, config_file: Optional[str] = None):
+    def __init__(self, config_file: Optional[str] = None, config_data: Optional[Dict[str, Any]] = None):
         """
         Initialize the configuration manager.
         
         Args:
             config_file: Path to configuration file (JSON format)
+            config_data: Already-parsed contents of config_file; skips reading the file
         """
         self.config_file = config_file
-        self._load_config()
+        self._load_config(config_data)
     
-    def _load_config(self):
+    def _load_config(self, config_data: Optional[Dict[str, Any]] = None):
         """Load configuration from file or use defaults."""
-        if self.config_file and os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                config_data = json.load(f)
+        if config_data is not None:
+            pass
+        elif self.config_file and os.path.exists(self.config_file):
+            config_data = _read_config_file(self.config_file)
         else:
             config_data = {}
         
@@ -235,8 +257,9 @@ class StudyFrameworkConfig:
             }
             
             os.makedirs(os.path.dirname(config_file), exist_ok=True)
-            with open(config_file, 'w') as f:
-                json.dump(config_data, f, indent=2)
+            # Serialize first and write once, rather than json.dump's many small writes
+            with open(config_file, 'wb') as f:
+                f.write(json.dumps(config_data, indent=2).encode('utf-8'))
     
     def get_database_url(self) -> str:
         """Get MongoDB connection URL."""
@@ -297,7 +320,10 @@ def get_config() -> StudyFrameworkConfig:
     return config
 
 
-def set_config_file(config_file: str):
-    """Set the configuration file and reload configuration."""
+def set_config_file(config_file: str, config_data: Optional[Dict[str, Any]] = None):
+    """Set the configuration file and reload configuration.
+    
+    If config_data is given it is used as the file's parsed contents instead of reading it.
+    """
     global config
-    config = StudyFrameworkConfig(config_file)
+    config = StudyFrameworkConfig(config_file, config_data)
@@ -375,8 +375,7 @@ def create_user(uid, email=None, study_id="A1"):
         config = get_config()
         
         # Check if user already exists
-        existing_user = db[config.collections.USERS].find_one({'uid': uid})
-        if existing_user:
+        if db[config.collections.USERS].count_documents({'uid': uid}, limit=1) > 0:
             return {'success': False, 'error': f'User {uid} already exists'}
         
         # Generate passwords
@@ -528,8 +527,7 @@ def create_admin_user(username="admin", password=None):
         db = get_db()
         
         # Check if admin user already exists
-        existing_admin = db['admin_users'].find_one({'username': username})
-        if existing_admin:
+        if db['admin_users'].count_documents({'username': username}, limit=1) > 0:
             return {'success': False, 'error': f'Admin user {username} already exists'}
         
         # Generate password if not provided
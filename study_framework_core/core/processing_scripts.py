@@ -13,6 +13,7 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any, Tuple
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import pandas as pd
 import pymongo
@@ -26,9 +27,9 @@ from study_framework_core.core.handlers import get_db
 class DataProcessor:
     """Main data processor for handling all backend processing tasks."""
     
-    def __init__(self):
+    def __init__(self, db=None):
         self.config = get_config()
-        self.db = get_db()
+        self.db = db if db is not None else get_db()
         self.records = {}  # For batch processing
         self.batch_size = 2000  # Batch size for bulk inserts
         self.setup_logging()
@@ -567,17 +568,11 @@ class DataProcessor:
                 return True  # Not an error if no files exist
             
             processed_count = 0
-            for fit_file in fit_files:
-                try:
-                    self.logger.info(f"Processing Garmin FIT file: {fit_file}")
-                    success = self.process_garmin_fit_file(user, str(fit_file))
-                    if success:
-                        processed_count += 1
-                        # Archive the processed file
-                        self.archive_file(user, str(fit_file))
-                except Exception as e:
-                    self.logger.error(f"Error processing FIT file {fit_file}: {e}")
-                    continue
+            for fit_file, success in self._process_fit_files(user, fit_files):
+                if success:
+                    processed_count += 1
+                    # Archive the processed file
+                    self.archive_file(user, str(fit_file))
             
             self.logger.info(f"Successfully processed {processed_count} Garmin files for user: {user}")
             return True
@@ -586,6 +581,37 @@ class DataProcessor:
             self.logger.error(f"Exception processing Garmin data for {user}: {e}")
             return False
     
+    def _process_fit_files(self, user: str, fit_files: List[Path]):
+        """
+        Process FIT files, yielding (fit_file, success) as each one finishes.
+        
+        FIT conversion and CSV parsing are CPU-bound and independent per file,
+        so multiple files are spread across worker processes.
+        """
+        # Workers rebuild only the state DataProcessor.__init__ sets up; a subclass
+        # with its own __init__ may need more (or arguments), so it runs serially
+        if len(fit_files) == 1 or type(self).__init__ is not DataProcessor.__init__:
+            for fit_file in fit_files:
+                try:
+                    yield fit_file, self.process_garmin_fit_file(user, str(fit_file))
+                except Exception as e:
+                    self.logger.error(f"Error processing FIT file {fit_file}: {e}")
+            return
+        
+        max_workers = min(os.cpu_count() or 1, len(fit_files))
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_garmin_worker,
+                                 initargs=(type(self), self.batch_size)) as executor:
+            futures = {executor.submit(_process_garmin_file_worker, user, str(fit_file)): fit_file
+                       for fit_file in fit_files}
+            
+            for future in as_completed(futures):
+                fit_file = futures[future]
+                try:
+                    yield fit_file, future.result()
+                except Exception as e:
+                    self.logger.error(f"Error processing FIT file {fit_file}: {e}")
+    
     def _process_location_data(self, user: str, upload_path: Path):
         """Process location/GPS data from iOS database files."""
         # Location data is now processed as part of sensor data from iOS databases
@@ -1876,6 +1902,33 @@ class DataProcessor:
     
 
 
+# Per-process processor used by the Garmin FIT worker pool
+_worker_processor = None
+
+
+def _init_garmin_worker(processor_class, batch_size):
+    """
+    Set up the processor for a Garmin worker process.
+    
+    __init__ is skipped: a worker needs neither logging setup nor index
+    creation, and its MongoDB client is only created for the first file.
+    """
+    global _worker_processor
+    processor = processor_class.__new__(processor_class)
+    processor.config = get_config()
+    processor.db = None
+    processor.records = {}
+    processor.batch_size = batch_size
+    processor.logger = logging.getLogger(__name__)
+    _worker_processor = processor
+
+
+def _process_garmin_file_worker(user: str, fit_file: str) -> bool:
+    """Process a single FIT file inside a worker process."""
+    if _worker_processor.db is None:
+        _worker_processor.db = get_db()
+    return _worker_processor.process_garmin_fit_file(user, fit_file)
+
 
 def process_all_data():
     """Process all data for all users."""
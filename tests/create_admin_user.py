@@ -30,15 +30,18 @@ def main():
         print(f"❌ Submodule not found: {submodule_path}")
         sys.exit(1)
     
-    sys.path.insert(0, str(submodule_path))
-    
-    # Set environment variable for config
     config_file = study_dir / "config" / "study_config.json"
     if not config_file.exists():
         print(f"❌ Config file not found: {config_file}")
         sys.exit(1)
     
-    os.environ['STUDY_CONFIG_FILE'] = str(config_file)
+    # Set up sys.path and the config environment once for this process
+    try:
+        from study_framework_core._bootstrap import ensure_env
+    except ImportError:
+        sys.path.insert(0, str(submodule_path))
+        from study_framework_core._bootstrap import ensure_env
+    ensure_env(study_dir)
     
     try:
         from study_framework_core.core.handlers import create_admin_user
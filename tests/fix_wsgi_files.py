@@ -4,20 +4,14 @@ Script to fix WSGI files for the study.
 Run this from the study directory.
 """
 
+import os
 import sys
 from pathlib import Path
 
-def main():
-    # Get the study directory (parent of this script)
-    script_dir = Path(__file__).parent
-    study_dir = script_dir.parent
-    
-    print(f"🔧 Fixing WSGI files for study: {study_dir.name}")
-    
-    # API WSGI file
-    api_wsgi_content = f"""#!/usr/bin/env python3
+# WSGI file templates; only {study_name} varies between studies
+API_WSGI_TEMPLATE = """#!/usr/bin/env python3
 \"\"\"
-API WSGI entry point for {study_dir.name} (Data Collection - Priority #1)
+API WSGI entry point for {study_name} (Data Collection - Priority #1)
 \"\"\"
 
 import sys
@@ -52,15 +46,10 @@ core_api = CoreAPIEndpoints(api, config.security.auth_key)
 if __name__ == "__main__":
     app.run()
 """
-    
-    api_wsgi_file = study_dir / "api_wsgi.py"
-    api_wsgi_file.write_text(api_wsgi_content)
-    print(f"✅ Fixed API WSGI file: {api_wsgi_file}")
-    
-    # Internal Web WSGI file
-    internal_wsgi_content = f"""#!/usr/bin/env python3
+
+INTERNAL_WSGI_TEMPLATE = """#!/usr/bin/env python3
 \"\"\"
-Internal Web WSGI entry point for {study_dir.name} (Dashboard - Priority #2)
+Internal Web WSGI entry point for {study_name} (Dashboard - Priority #2)
 \"\"\"
 
 import sys
@@ -75,13 +64,9 @@ sys.path.insert(0, str(submodule_path))
 # Set environment variable for config
 os.environ['STUDY_CONFIG_FILE'] = str(study_path / "config" / "study_config.json")
 
-from study_framework_core.core.config import get_config
 from study_framework_core.core.internal_web import InternalWebBase, SimpleDashboard
 from flask import Flask
 
-# Load configuration
-config = get_config()
-
 # Create Flask app with template directory
 template_dir = submodule_path / "study_framework_core" / "templates"
 app = Flask(__name__, template_folder=str(template_dir))
@@ -89,24 +74,36 @@ app = Flask(__name__, template_folder=str(template_dir))
 # Create dashboard instance
 dashboard = SimpleDashboard()
 
-# Create internal web instance
+# Create internal web instance (registers its routes on app)
 internal_web = InternalWebBase(app, dashboard)
 
-# Get the Flask app
-app = internal_web.app
-
 if __name__ == "__main__":
     app.run()
 """
+
+
+def main():
+    # Get the study directory (parent of this script)
+    script_dir = Path(__file__).parent
+    study_dir = script_dir.parent
+    
+    study_name = study_dir.name
+    
+    print(f"🔧 Fixing WSGI files for study: {study_name}")
+    
+    # API WSGI file
+    api_wsgi_file = study_dir / "api_wsgi.py"
+    api_wsgi_file.write_bytes(API_WSGI_TEMPLATE.format(study_name=study_name).encode('utf-8'))
+    print(f"✅ Fixed API WSGI file: {api_wsgi_file}")
     
+    # Internal Web WSGI file
     internal_wsgi_file = study_dir / "internal_wsgi.py"
-    internal_wsgi_file.write_text(internal_wsgi_content)
+    internal_wsgi_file.write_bytes(INTERNAL_WSGI_TEMPLATE.format(study_name=study_name).encode('utf-8'))
     print(f"✅ Fixed Internal Web WSGI file: {internal_wsgi_file}")
     
     # Make both executable
-    import subprocess
-    subprocess.run(['chmod', '+x', str(api_wsgi_file)])
-    subprocess.run(['chmod', '+x', str(internal_wsgi_file)])
+    os.chmod(api_wsgi_file, 0o755)
+    os.chmod(internal_wsgi_file, 0o755)
     print("✅ Made WSGI files executable")
     
     print("\n🎯 WSGI files fixed! Now restart the services:")
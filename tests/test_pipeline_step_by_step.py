@@ -4,6 +4,12 @@ Step-by-Step Pipeline Test Script
 
 This script allows testing individual components of the pipeline for debugging.
 Run individual functions to test specific parts of the system.
+
+Usage:
+    python test_pipeline_step_by_step.py [--user USER] [--cleanup | --no-cleanup]
+
+Without either cleanup flag, the full pipeline asks whether to clean up when
+run from a terminal and leaves the test data in place otherwise.
 """
 
 import os
@@ -14,8 +20,8 @@ import shutil
 import requests
 import time
 from pathlib import Path
-from datetime import datetime, timedelta
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
 # Add the project root to Python path
@@ -30,21 +36,38 @@ if config_file.exists():
 else:
     print(f"Warning: Config file not found at {config_file}")
 
-from study_framework_core.core.config import get_config
-from study_framework_core.core.handlers import get_db, create_user
-from study_framework_core.core.processing_scripts import DataProcessor
+# Number of collections queried concurrently (PyMongo clients are thread-safe)
+DB_QUERY_WORKERS = 8
+
+
+def _iter_files(root):
+    """Yield os.DirEntry objects for every file under root (iterative scandir walk)."""
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    yield entry
 
 
 class StepByStepTester:
     """Step-by-step pipeline tester for debugging."""
     
-    def __init__(self):
+    def __init__(self, test_user: str = "test130"):
+        # Framework imports are deferred until a tester is actually needed
+        from study_framework_core.core.config import get_config
+        from study_framework_core.core.handlers import get_db
+        
         self.config = get_config()
         self.db = get_db()
-        self.test_user = "test130"
+        self.test_user = test_user
         self.test_data_dir = project_root / "test_data"
         self.api_base_url = "http://localhost/api/v1"
         self.user_credentials = None
+        self._processor = None
+        self._collection_names = None
         
         # Debug: Print config paths
         print(f"DEBUG: Config data_upload_path: {self.config.paths.data_upload_path}")
@@ -53,8 +76,8 @@ class StepByStepTester:
         
     def log(self, message: str, level: str = "INFO"):
         """Log messages with timestamp."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] {level}: {message}")
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        sys.stdout.write(f"[{timestamp}] {level}: {message}\n")
     
     def check_prerequisites(self):
         """Check if all prerequisites are met."""
@@ -106,12 +129,12 @@ class StepByStepTester:
             zip_ref.extractall(self.test_data_dir)
         
         # List extracted files
-        files = list(self.test_data_dir.rglob("*"))
+        files = [entry.path for entry in _iter_files(self.test_data_dir)]
         self.log(f"✅ Extracted {len(files)} files to {self.test_data_dir}")
         
         # Show file structure
         for file in files[:10]:
-            self.log(f"  - {file.relative_to(self.test_data_dir)}")
+            self.log(f"  - {os.path.relpath(file, self.test_data_dir)}")
         if len(files) > 10:
             self.log(f"  ... and {len(files) - 10} more files")
         
@@ -122,12 +145,12 @@ class StepByStepTester:
         self.log("Creating test user...")
         
         # Check if user already exists
-        existing_user = self.db['users'].find_one({'uid': self.test_user})
-        if existing_user:
+        if self.db['users'].count_documents({'uid': self.test_user}, limit=1) > 0:
             self.log(f"⚠️ User {self.test_user} already exists")
             return True
         
         # Create user
+        from study_framework_core.core.handlers import create_user
         result = create_user(self.test_user, email=f"{self.test_user}@test.com")
         
         if result['success']:
@@ -181,11 +204,10 @@ class StepByStepTester:
         
         # Find all data files
         data_files = []
-        for file_path in self.test_data_dir.rglob("*"):
-            if file_path.is_file():
-                file_name = file_path.name.lower()
-                if any(ext in file_name for ext in ['.db', '.json', '.fit', '.csv']):
-                    data_files.append(file_path)
+        for entry in _iter_files(self.test_data_dir):
+            file_name = entry.name.lower()
+            if any(ext in file_name for ext in ['.db', '.json', '.fit', '.csv']):
+                data_files.append(Path(entry.path))
         
         self.log(f"Found {len(data_files)} files to upload")
         
@@ -227,13 +249,28 @@ class StepByStepTester:
             else:
                 self.log("Warning: Could not find study_config.json. Using default configuration.")
     
+    def _get_processor(self):
+        """Return the shared DataProcessor, creating it on first use."""
+        if self._processor is None:
+            from study_framework_core.core.processing_scripts import DataProcessor
+            self._processor = DataProcessor(db=self.db)
+        # Processing may create new collections
+        self._collection_names = None
+        return self._processor
+    
+    def _existing_collections(self):
+        """Return the set of collection names that exist in the database."""
+        if self._collection_names is None:
+            self._collection_names = set(self.db.list_collection_names())
+        return self._collection_names
+    
     def process_phone_data(self, force_user=None):
         """Process phone data for the test user or specified user."""
         user_to_process = force_user if force_user else self.test_user
         self.log(f"Processing phone data for user: {user_to_process}")
         
         self._setup_environment()
-        processor = DataProcessor()
+        processor = self._get_processor()
         success = processor.process_phone_data(user_to_process)
         
         if success:
@@ -249,7 +286,7 @@ class StepByStepTester:
         self.log(f"Processing Garmin data for user: {user_to_process}")
         
         self._setup_environment()
-        processor = DataProcessor()
+        processor = self._get_processor()
         success = processor.process_garmin_data(user_to_process)
         
         if success:
@@ -267,7 +304,7 @@ class StepByStepTester:
             self.log(f"Generating daily summaries for last {days_back} days and today...")
         
         self._setup_environment()
-        processor = DataProcessor()
+        processor = self._get_processor()
         
         # Use the new core method for generating summaries for a period
         success = processor.generate_summaries_for_period(days_back=days_back, force_user=force_user)
@@ -276,6 +313,7 @@ class StepByStepTester:
             self.log("✅ Daily summaries generated")
             
             # Show summary data for the last few days
+            from study_framework_core.core.config import get_config
             config = get_config()
             summaries = list(self.db[config.collections.DAILY_SUMMARY].find(
                 {'uid': self.test_user}
@@ -297,12 +335,19 @@ class StepByStepTester:
         
         return success
     
-    def check_database_data(self):
-        """Check what data is in the database."""
-        self.log("Checking database data...")
+    def _count_user_documents(self, collection_name):
+        """Count the test user's records in a collection.
         
+        Indexes are left to DataProcessor.init_collections, whose uid-prefixed
+        indexes the query planner picks up without a hint.
+        """
+        return self.db[collection_name].count_documents({'uid': self.test_user})
+    
+    def _user_data_collections(self):
+        """Return the per-user data collections the pipeline writes to."""
+        from study_framework_core.core.config import get_config
         config = get_config()
-        collections_to_check = [
+        return [
             config.collections.IOS_LOCATION,
             config.collections.IOS_ACTIVITY,
             config.collections.IOS_STEPS,
@@ -326,10 +371,24 @@ class StepByStepTester:
             config.collections.DAILY_SUMMARY,
             config.collections.UNKNOWN_EVENTS
         ]
+    
+    def check_database_data(self):
+        """Check what data is in the database."""
+        self.log("Checking database data...")
+        
+        collections_to_check = self._user_data_collections()
+        
+        # Only query collections that actually exist
+        existing = self._existing_collections()
+        present = [name for name in collections_to_check if name in existing]
+        
+        # Count all collections concurrently so we wait ~1 round-trip instead of 22
+        with ThreadPoolExecutor(max_workers=DB_QUERY_WORKERS) as executor:
+            counts = dict(zip(present, executor.map(self._count_user_documents, present)))
         
         total_records = 0
         for collection_name in collections_to_check:
-            count = self.db[collection_name].count_documents({'uid': self.test_user})
+            count = counts.get(collection_name, 0)
             if count > 0:
                 self.log(f"  {collection_name}: {count} records")
                 total_records += count
@@ -356,22 +415,30 @@ class StepByStepTester:
         else:
             self.log(f"⚠️ User {self.test_user} not found")
         
-        # Remove all data from collections
-        collections_to_clean = [
+        # Remove all data from collections (current names plus legacy ones)
+        legacy_collections = [
             'location_data', 'activity_data', 'steps_data', 'battery_data',
             'wifi_data', 'bluetooth_data', 'brightness_data', 'garmin_hr_data',
             'garmin_stress_data', 'garmin_steps_data', 'garmin_respiration_data',
-            'garmin_ibi_data', 'garmin_accelerometer', 'calllog_data',
-            'lock_unlock_data', 'ema_data', 'ema_status_data', 'notification_data',
-            'app_usage_data', 'daily_diary_data', 'daily_summaries', 'unknown_events_data'
+            'garmin_ibi_data', 'calllog_data', 'lock_unlock_data', 'ema_data',
+            'ema_status_data', 'notification_data', 'app_usage_data', 'daily_diary_data'
         ]
+        collections_to_clean = self._user_data_collections() + legacy_collections
+        
+        existing = self._existing_collections()
+        collections_to_clean = [name for name in collections_to_clean if name in existing]
+        
+        with ThreadPoolExecutor(max_workers=DB_QUERY_WORKERS) as executor:
+            deleted_counts = list(executor.map(
+                lambda name: self.db[name].delete_many({'uid': self.test_user}).deleted_count,
+                collections_to_clean
+            ))
         
         total_deleted = 0
-        for collection_name in collections_to_clean:
-            result = self.db[collection_name].delete_many({'uid': self.test_user})
-            if result.deleted_count > 0:
-                self.log(f"✅ Deleted {result.deleted_count} records from {collection_name}")
-                total_deleted += result.deleted_count
+        for collection_name, deleted_count in zip(collections_to_clean, deleted_counts):
+            if deleted_count > 0:
+                self.log(f"✅ Deleted {deleted_count} records from {collection_name}")
+                total_deleted += deleted_count
         
         self.log(f"Total records deleted: {total_deleted}")
         
@@ -403,8 +470,38 @@ def show_menu():
     print("="*50)
 
 
+def parse_args(argv):
+    """Parse --user and the cleanup flags from argv (too few to warrant argparse)."""
+    user = "test130"
+    cleanup = None
+    
+    args = iter(argv)
+    for arg in args:
+        if arg == "--user":
+            user = next(args, None)
+            if user is None or user.startswith("-"):
+                print("❌ --user requires a value")
+                print(__doc__)
+                sys.exit(2)
+        elif arg == "--cleanup":
+            cleanup = True
+        elif arg == "--no-cleanup":
+            cleanup = False
+        elif arg in ("-h", "--help"):
+            print(__doc__)
+            sys.exit(0)
+        else:
+            print(f"❌ Unknown argument: {arg}")
+            print(__doc__)
+            sys.exit(2)
+    
+    return user, cleanup
+
+
 def main():
     """Main interactive function."""
+    test_user, cleanup = parse_args(sys.argv[1:])
+    
     print("Study Framework Pipeline Test - Step by Step")
     
     # Check if test file exists
@@ -414,11 +511,16 @@ def main():
         print("Please place test_file.zip in the same directory as this script.")
         return
     
-    tester = StepByStepTester()
+    tester = StepByStepTester(test_user)
     
     while True:
         show_menu()
-        choice = input("\nEnter your choice (0-10): ").strip()
+        try:
+            choice = input("\nEnter your choice (0-10): ").strip()
+        except EOFError:
+            # Scripted input ran out
+            print("Goodbye!")
+            break
         
         if choice == "0":
             print("Goodbye!")
@@ -464,8 +566,12 @@ def main():
                 tester.generate_summaries() and
                 tester.check_database_data()):
                 print("\n✅ Full pipeline completed successfully!")
-                response = input("Do you want to cleanup test data? (y/n): ").lower().strip()
-                if response in ['y', 'yes']:
+                do_cleanup = cleanup
+                # Only prompt when someone is there to answer
+                if do_cleanup is None and sys.stdin.isatty():
+                    response = input("Do you want to cleanup test data? (y/n): ").lower().strip()
+                    do_cleanup = response in ['y', 'yes']
+                if do_cleanup:
                     tester.cleanup_test_data()
             else:
                 print("\n❌ Pipeline failed at some step")
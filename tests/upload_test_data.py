@@ -17,8 +17,8 @@ import zipfile
 import shutil
 import requests
 import argparse
+import time
 from pathlib import Path
-from datetime import datetime
 from typing import Dict, List, Optional
 
 
@@ -33,8 +33,8 @@ class TestDataUploader:
         
     def log(self, message: str, level: str = "INFO"):
         """Log messages with timestamp."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] {level}: {message}")
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        sys.stdout.write(f"[{timestamp}] {level}: {message}\n")
     
     def check_prerequisites(self) -> bool:
         """Check if all prerequisites are met."""
@@ -40,9 +40,12 @@ def find_study_directory(study_name=None, base_dir=None):
     if not base_dir:
         base_dir = str(Path.cwd().parent)
     
+    # Directory name setup_study.py uses for the study (lowercase, spaces to dashes)
+    study_slug = study_name.lower().replace(' ', '-') if study_name else None
+    
     if study_name:
         # Look for study by name in base directory
-        study_path = Path(base_dir) / study_name.lower().replace(' ', '-')
+        study_path = Path(base_dir) / study_slug
         if study_path.exists():
             return study_path
     
@@ -57,7 +60,7 @@ def find_study_directory(study_name=None, base_dir=None):
     # If study_name provided, try common locations
     if study_name:
         common_paths = [
-            Path(base_dir) / study_name.lower().replace(' ', '-'),
+            Path(base_dir) / study_slug,
             Path(base_dir) / study_name.replace(' ', '-'),
             Path(base_dir) / study_name,
         ]
@@ -94,6 +97,19 @@ def get_conda_path(study_path):
     return "conda"  # Fallback to conda in PATH
 
 
+def get_pip_command(conda_path, env_name):
+    """Return the command prefix that runs pip in the study's environment.
+    
+    The environment's own pip is used when it is found under the conda install,
+    which avoids the activation overhead of `conda run`; otherwise conda run is used.
+    """
+    conda_binary = shutil.which(conda_path) or conda_path
+    env_pip = Path(conda_binary).resolve().parent.parent / "envs" / env_name / "bin" / "pip"
+    if env_pip.exists():
+        return str(env_pip)
+    return f"{conda_path} run -n {env_name} pip"
+
+
 def check_submodule_setup():
     """Check if we're in a properly set up submodule."""
     print("🔍 Checking submodule setup...")
@@ -150,14 +166,15 @@ def update_core_framework(study_path, study_name=None, conda_env=None):
     
     # Update the core package in the study's environment
     print("📦 Updating core package...")
-    update_command = f"{conda_path} run -n {env_name} pip install --upgrade -e ."
+    pip_command = get_pip_command(conda_path, env_name)
+    update_command = f"{pip_command} install --upgrade -e ."
     run_command(update_command)
     
     # Install/update requirements to ensure all dependencies are available
     print("📦 Installing/updating requirements...")
     requirements_file = Path.cwd() / "requirements.txt"
     if requirements_file.exists():
-        install_command = f"{conda_path} run -n {env_name} pip install -r {requirements_file}"
+        install_command = f"{pip_command} install -r {requirements_file}"
         run_command(install_command)
     else:
         print("⚠️  Warning: requirements.txt not found in core framework")